@@ -7,10 +7,12 @@ CREATE TABLE IF NOT EXISTS companies (
     name TEXT UNIQUE NOT NULL,
     short_name TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    search_tsv tsvector GENERATED ALWAYS AS (to_tsvector('simple', name)) STORED
 );
 
 CREATE INDEX IF NOT EXISTS idx_companies_name ON companies(name);
+CREATE INDEX IF NOT EXISTS idx_companies_search_tsv ON companies USING GIN (search_tsv);
 
 -- Locations table
 CREATE TABLE IF NOT EXISTS locations (
@@ -23,6 +25,10 @@ CREATE TABLE IF NOT EXISTS locations (
 );
 
 CREATE INDEX IF NOT EXISTS idx_locations_city ON locations(city);
+-- UNIQUE(city, state, country) treats NULL states as distinct, so stateless
+-- locations (e.g. Remote) are kept unique here; upserts conflict on this index
+CREATE UNIQUE INDEX IF NOT EXISTS idx_locations_city_state_country
+    ON locations(city, COALESCE(state, ''), country);
 
 -- Skill categories table
 CREATE TABLE IF NOT EXISTS skill_categories (
@@ -43,6 +49,8 @@ CREATE TABLE IF NOT EXISTS skills (
 
 CREATE INDEX IF NOT EXISTS idx_skills_name ON skills(name);
 CREATE INDEX IF NOT EXISTS idx_skills_category ON skills(category_id);
+-- Case-insensitive lookups: LOWER(name) = ... and LOWER(name) LIKE 'prefix%'
+CREATE INDEX IF NOT EXISTS idx_skills_name_lower ON skills(LOWER(name) text_pattern_ops);
 
 -- Jobs table
 CREATE TABLE IF NOT EXISTS jobs (
@@ -63,6 +71,8 @@ CREATE TABLE IF NOT EXISTS jobs (
     status TEXT DEFAULT 'open',
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    -- Word index over the title for the job listing search
+    search_tsv tsvector GENERATED ALWAYS AS (to_tsvector('simple', title)) STORED,
     FOREIGN KEY (company_id) REFERENCES companies(id)
 );
 
@@ -72,6 +82,13 @@ CREATE INDEX IF NOT EXISTS idx_jobs_publication_date ON jobs(publication_date);
 CREATE INDEX IF NOT EXISTS idx_jobs_remote ON jobs(is_remote);
 CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status);
 CREATE INDEX IF NOT EXISTS idx_jobs_last_seen_at ON jobs(last_seen_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_search_tsv ON jobs USING GIN (search_tsv);
+-- Backs the mark-closed sweep over open jobs only
+CREATE INDEX IF NOT EXISTS idx_jobs_open_lastseen
+    ON jobs ((COALESCE(last_seen_at, '-infinity'::timestamp))) WHERE status = 'open';
+-- Backs the job listing when filtered by level, newest first
+CREATE INDEX IF NOT EXISTS idx_jobs_open_level_date
+    ON jobs (job_level, publication_date) WHERE status = 'open';
 
 -- Job-Locations junction table (many-to-many relationship)
 CREATE TABLE IF NOT EXISTS job_locations (
@@ -82,7 +99,7 @@ CREATE TABLE IF NOT EXISTS job_locations (
     FOREIGN KEY (location_id) REFERENCES locations(id)
 );
 
-CREATE INDEX IF NOT EXISTS idx_job_locations_location ON job_locations(location_id);
+CREATE INDEX IF NOT EXISTS idx_job_locations_location ON job_locations(location_id, job_id);
 CREATE INDEX IF NOT EXISTS idx_job_locations_job ON job_locations(job_id);
 
 -- Job-Skills junction table (many-to-many relationship)
@@ -94,5 +111,82 @@ CREATE TABLE IF NOT EXISTS job_skills (
     FOREIGN KEY (skill_id) REFERENCES skills(id)
 );
 
-CREATE INDEX IF NOT EXISTS idx_job_skills_skill ON job_skills(skill_id);
+CREATE INDEX IF NOT EXISTS idx_job_skills_skill ON job_skills(skill_id, job_id);
 CREATE INDEX IF NOT EXISTS idx_job_skills_job ON job_skills(job_id);
+
+-- Skill co-occurrence aggregates backing SkillRecommender, refreshed after
+-- job_skills changes via skill_recommender.refresh_skill_counts
+CREATE MATERIALIZED VIEW IF NOT EXISTS skill_job_counts AS
+    SELECT skill_id, COUNT(*) AS cnt FROM job_skills GROUP BY skill_id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_skill_job_counts_skill ON skill_job_counts(skill_id);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS skill_pair_counts AS
+    SELECT a.skill_id AS a_id, b.skill_id AS b_id, COUNT(*) AS cnt
+    FROM job_skills a
+    JOIN job_skills b ON a.job_id = b.job_id AND a.skill_id <> b.skill_id
+    GROUP BY a.skill_id, b.skill_id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_skill_pair_counts_pair ON skill_pair_counts(a_id, b_id);
+
+-- Dashboard aggregates behind get_dashboard_stats, one row, refreshed after
+-- jobs change via db_queries.refresh_dashboard_stats
+CREATE MATERIALIZED VIEW IF NOT EXISTS dashboard_stats AS
+    SELECT
+        1 AS id,
+        (SELECT COUNT(*) FROM jobs WHERE status = 'open') AS total_jobs,
+        (SELECT COUNT(*) FROM companies) AS total_companies,
+        (SELECT COUNT(*) FROM skills s
+            JOIN skill_categories sc ON s.category_id = sc.id
+            WHERE sc.name != 'Soft_Skills') AS total_skills,
+        (SELECT COUNT(*) FROM jobs
+            WHERE (salary_min IS NOT NULL OR salary_max IS NOT NULL)
+              AND (salary_min IS NULL OR salary_min >= 15000)
+              AND (salary_max IS NULL OR salary_max >= 15000)) AS jobs_with_salary,
+        (SELECT COUNT(*) FROM jobs WHERE is_remote = TRUE) AS remote_count,
+        (SELECT COALESCE(json_agg(x ORDER BY x.cnt DESC), '[]')
+            FROM (SELECT job_level, COUNT(*) AS cnt FROM jobs GROUP BY job_level) x
+        ) AS jobs_by_level,
+        (SELECT COALESCE(json_agg(x ORDER BY x.cnt DESC), '[]')
+            FROM (SELECT s.name, sc.name AS cat_name, COUNT(*) AS cnt
+                  FROM job_skills js
+                  JOIN skills s ON js.skill_id = s.id
+                  JOIN skill_categories sc ON s.category_id = sc.id
+                  WHERE sc.name != 'Soft_Skills'
+                  GROUP BY s.id, s.name, sc.name
+                  ORDER BY cnt DESC
+                  LIMIT 15) x
+        ) AS top_skills,
+        (SELECT COALESCE(json_agg(x ORDER BY x.month), '[]')
+            FROM (SELECT TO_CHAR(publication_date, 'YYYY-MM') AS month, COUNT(*) AS cnt
+                  FROM jobs
+                  WHERE publication_date IS NOT NULL
+                  GROUP BY month) x
+        ) AS monthly_trends,
+        (SELECT COALESCE(json_agg(x ORDER BY x.avg_salary DESC), '[]')
+            FROM (SELECT s.name, COUNT(*) AS job_count,
+                         AVG((COALESCE(j.salary_min, 0) + COALESCE(j.salary_max, 0)) /
+                             CASE WHEN j.salary_min IS NOT NULL AND j.salary_max IS NOT NULL THEN 2
+                                  ELSE 1 END) AS avg_salary
+                  FROM job_skills js
+                  JOIN skills s ON js.skill_id = s.id
+                  JOIN skill_categories sc ON s.category_id = sc.id
+                  JOIN jobs j ON js.job_id = j.id
+                  WHERE sc.name = 'Languages'
+                    AND (j.salary_min IS NOT NULL OR j.salary_max IS NOT NULL)
+                    AND COALESCE(j.salary_min, j.salary_max) >= 15000
+                  GROUP BY s.id, s.name
+                  HAVING COUNT(*) >= 3
+                  ORDER BY avg_salary DESC
+                  LIMIT 10) x
+        ) AS salary_by_language,
+        (SELECT row_to_json(x)
+            FROM (SELECT AVG(salary_min) AS avg_min, AVG(salary_max) AS avg_max,
+                         MIN(salary_min) AS min_sal, MAX(salary_max) AS max_sal
+                  FROM jobs
+                  WHERE salary_min IS NOT NULL AND salary_max IS NOT NULL
+                        AND salary_min >= 15000 AND salary_max >= 15000) x
+        ) AS salary_overview;
+
+-- Single-row key so the view can be refreshed CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_dashboard_stats_id ON dashboard_stats(id);
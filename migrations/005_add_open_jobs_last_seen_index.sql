@@ -0,0 +1,2 @@
+CREATE INDEX IF NOT EXISTS idx_jobs_open_lastseen
+    ON jobs ((COALESCE(last_seen_at, '-infinity'::timestamp))) WHERE status = 'open';
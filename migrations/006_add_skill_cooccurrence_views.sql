@@ -0,0 +1,12 @@
+CREATE MATERIALIZED VIEW IF NOT EXISTS skill_job_counts AS
+    SELECT skill_id, COUNT(*) AS cnt FROM job_skills GROUP BY skill_id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_skill_job_counts_skill ON skill_job_counts(skill_id);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS skill_pair_counts AS
+    SELECT a.skill_id AS a_id, b.skill_id AS b_id, COUNT(*) AS cnt
+    FROM job_skills a
+    JOIN job_skills b ON a.job_id = b.job_id AND a.skill_id <> b.skill_id
+    GROUP BY a.skill_id, b.skill_id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_skill_pair_counts_pair ON skill_pair_counts(a_id, b_id);
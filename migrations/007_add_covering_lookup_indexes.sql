@@ -0,0 +1,11 @@
+-- Widen the reverse-lookup junction indexes so skill/location -> job scans
+-- are index-only, and index case-insensitive skill name lookups
+DROP INDEX IF EXISTS idx_job_skills_skill;
+CREATE INDEX idx_job_skills_skill ON job_skills (skill_id, job_id);
+
+DROP INDEX IF EXISTS idx_job_locations_location;
+CREATE INDEX idx_job_locations_location ON job_locations (location_id, job_id);
+
+CREATE INDEX IF NOT EXISTS idx_skills_name_lower ON skills (LOWER(name) text_pattern_ops);
+
+ANALYZE skills, job_skills, job_locations;
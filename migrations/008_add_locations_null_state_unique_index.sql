@@ -0,0 +1,30 @@
+-- Make stateless locations unique: UNIQUE(city, state, country) lets rows
+-- with a NULL state repeat. Duplicates are folded into the lowest id first.
+INSERT INTO job_locations (job_id, location_id)
+SELECT jl.job_id, keep.id
+FROM job_locations jl
+JOIN locations dup ON dup.id = jl.location_id
+JOIN locations keep
+  ON keep.city = dup.city
+ AND COALESCE(keep.state, '') = COALESCE(dup.state, '')
+ AND keep.country = dup.country
+ AND keep.id < dup.id
+ON CONFLICT DO NOTHING;
+
+DELETE FROM job_locations jl
+USING locations dup, locations keep
+WHERE dup.id = jl.location_id
+  AND keep.city = dup.city
+  AND COALESCE(keep.state, '') = COALESCE(dup.state, '')
+  AND keep.country = dup.country
+  AND keep.id < dup.id;
+
+DELETE FROM locations dup
+USING locations keep
+WHERE keep.city = dup.city
+  AND COALESCE(keep.state, '') = COALESCE(dup.state, '')
+  AND keep.country = dup.country
+  AND keep.id < dup.id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_locations_city_state_country
+    ON locations (city, COALESCE(state, ''), country);
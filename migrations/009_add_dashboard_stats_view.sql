@@ -0,0 +1,61 @@
+-- Precompute the dashboard aggregates so get_dashboard_stats reads one row
+-- instead of scanning jobs/job_skills per request
+CREATE MATERIALIZED VIEW IF NOT EXISTS dashboard_stats AS
+    SELECT
+        1 AS id,
+        (SELECT COUNT(*) FROM jobs WHERE status = 'open') AS total_jobs,
+        (SELECT COUNT(*) FROM companies) AS total_companies,
+        (SELECT COUNT(*) FROM skills s
+            JOIN skill_categories sc ON s.category_id = sc.id
+            WHERE sc.name != 'Soft_Skills') AS total_skills,
+        (SELECT COUNT(*) FROM jobs
+            WHERE (salary_min IS NOT NULL OR salary_max IS NOT NULL)
+              AND (salary_min IS NULL OR salary_min >= 15000)
+              AND (salary_max IS NULL OR salary_max >= 15000)) AS jobs_with_salary,
+        (SELECT COUNT(*) FROM jobs WHERE is_remote = TRUE) AS remote_count,
+        (SELECT COALESCE(json_agg(x ORDER BY x.cnt DESC), '[]')
+            FROM (SELECT job_level, COUNT(*) AS cnt FROM jobs GROUP BY job_level) x
+        ) AS jobs_by_level,
+        (SELECT COALESCE(json_agg(x ORDER BY x.cnt DESC), '[]')
+            FROM (SELECT s.name, sc.name AS cat_name, COUNT(*) AS cnt
+                  FROM job_skills js
+                  JOIN skills s ON js.skill_id = s.id
+                  JOIN skill_categories sc ON s.category_id = sc.id
+                  WHERE sc.name != 'Soft_Skills'
+                  GROUP BY s.id, s.name, sc.name
+                  ORDER BY cnt DESC
+                  LIMIT 15) x
+        ) AS top_skills,
+        (SELECT COALESCE(json_agg(x ORDER BY x.month), '[]')
+            FROM (SELECT TO_CHAR(publication_date, 'YYYY-MM') AS month, COUNT(*) AS cnt
+                  FROM jobs
+                  WHERE publication_date IS NOT NULL
+                  GROUP BY month) x
+        ) AS monthly_trends,
+        (SELECT COALESCE(json_agg(x ORDER BY x.avg_salary DESC), '[]')
+            FROM (SELECT s.name, COUNT(*) AS job_count,
+                         AVG((COALESCE(j.salary_min, 0) + COALESCE(j.salary_max, 0)) /
+                             CASE WHEN j.salary_min IS NOT NULL AND j.salary_max IS NOT NULL THEN 2
+                                  ELSE 1 END) AS avg_salary
+                  FROM job_skills js
+                  JOIN skills s ON js.skill_id = s.id
+                  JOIN skill_categories sc ON s.category_id = sc.id
+                  JOIN jobs j ON js.job_id = j.id
+                  WHERE sc.name = 'Languages'
+                    AND (j.salary_min IS NOT NULL OR j.salary_max IS NOT NULL)
+                    AND COALESCE(j.salary_min, j.salary_max) >= 15000
+                  GROUP BY s.id, s.name
+                  HAVING COUNT(*) >= 3
+                  ORDER BY avg_salary DESC
+                  LIMIT 10) x
+        ) AS salary_by_language,
+        (SELECT row_to_json(x)
+            FROM (SELECT AVG(salary_min) AS avg_min, AVG(salary_max) AS avg_max,
+                         MIN(salary_min) AS min_sal, MAX(salary_max) AS max_sal
+                  FROM jobs
+                  WHERE salary_min IS NOT NULL AND salary_max IS NOT NULL
+                        AND salary_min >= 15000 AND salary_max >= 15000) x
+        ) AS salary_overview;
+
+-- Single-row key so the view can be refreshed CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_dashboard_stats_id ON dashboard_stats(id);
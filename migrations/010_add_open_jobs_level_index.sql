@@ -0,0 +1,4 @@
+-- Level-filtered job listings page through open jobs newest first; without
+-- this they walk publication_date and discard other levels
+CREATE INDEX IF NOT EXISTS idx_jobs_open_level_date
+    ON jobs (job_level, publication_date) WHERE status = 'open';
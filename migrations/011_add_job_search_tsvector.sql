@@ -0,0 +1,9 @@
+-- Full-text search for the job listing: ILIKE '%term%' on title and company
+-- name can't use an index, so each gets a generated word vector with a GIN index
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS search_tsv tsvector
+    GENERATED ALWAYS AS (to_tsvector('simple', title)) STORED;
+CREATE INDEX IF NOT EXISTS idx_jobs_search_tsv ON jobs USING GIN (search_tsv);
+
+ALTER TABLE companies ADD COLUMN IF NOT EXISTS search_tsv tsvector
+    GENERATED ALWAYS AS (to_tsvector('simple', name)) STORED;
+CREATE INDEX IF NOT EXISTS idx_companies_search_tsv ON companies USING GIN (search_tsv);
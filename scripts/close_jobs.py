@@ -34,6 +34,8 @@ from dotenv import load_dotenv
 ROOT_DIR = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT_DIR / "src"))
 
+from market_analyzer.db_queries import refresh_dashboard_stats
+
 load_dotenv(ROOT_DIR / ".env")
 
 DATABASE_URL = os.getenv(
@@ -199,6 +201,10 @@ def run(days: int = 7, batch_size: int = 500, dry_run: bool = False):
                 time.sleep(REQUEST_DELAY)
 
         if not dry_run:
+            # Open-job totals on the dashboard come from a precomputed view
+            if stats["closed"]:
+                with conn.cursor() as cur:
+                    refresh_dashboard_stats(cur)
             conn.commit()
             print("\nChanges committed.")
         else:
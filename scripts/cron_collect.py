@@ -30,6 +30,7 @@ import argparse
 import json
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
@@ -41,7 +42,6 @@ STATE_FILE = ROOT_DIR / "data" / "cron_state.json"
 LOG_DIR = ROOT_DIR / "logs"
 
 SERP_DELAY_BETWEEN_STATES = 3  # stays well under 200/hr
-MUSE_DELAY_BETWEEN_STATES = 2
 
 # Queries rotate each run for broader coverage
 SEARCH_QUERIES = [
@@ -68,6 +68,21 @@ def _get_collector():
     return TOP_CITIES_BY_STATE, get_google_jobs, save_google_jobs_to_db, get_muse_jobs, save_to_file
 
 
+def _wait_for_write(future, writer):
+    """Block on a background DB write, reporting (not raising) its failure.
+
+    A failed write leaves the shared writer's transaction aborted, so it is
+    rolled back before the next state is submitted.
+    """
+    if future is None:
+        return
+    try:
+        future.result()
+    except Exception as e:
+        print(f"  DB write error: {e}")
+        writer.rollback()
+
+
 def _get_state_groups():
     """Build A/B state rotation groups from collector's state list."""
     TOP_CITIES_BY_STATE, *_ = _get_collector()
@@ -109,6 +124,7 @@ def reset_monthly_if_needed(state: dict) -> dict:
 
 def run_serp(pages: int = 1, dry_run: bool = False):
     TOP_CITIES_BY_STATE, get_google_jobs, save_google_jobs_to_db, _, _ = _get_collector()
+    from market_analyzer.collector import _JobDBWriter
     ALL_STATES, GROUP_A, GROUP_B = _get_state_groups()
 
     state = load_state()
@@ -148,32 +164,47 @@ def run_serp(pages: int = 1, dry_run: bool = False):
     total_jobs = 0
     actual_calls = 0
 
-    for i, state_name in enumerate(states_today, 1):
-        city = TOP_CITIES_BY_STATE[state_name]
-        print(f"[{i}/{len(states_today)}] {state_name} ({city})")
-
-        if dry_run:
-            print(f"  -> [DRY RUN] would fetch {pages} page(s)")
-            actual_calls += pages
-            continue
-
-        try:
-            jobs = get_google_jobs(
-                query=query,
-                location=city,
-                num_pages=pages,
-            )
-            total_jobs += len(jobs)
-            actual_calls += min(pages, max(1, len(jobs) // 10 + 1))
-
-            if jobs:
-                save_google_jobs_to_db(jobs)
-
-        except Exception as e:
-            print(f"  Error: {e}")
-
-        if i < len(states_today):
-            time.sleep(SERP_DELAY_BETWEEN_STATES)
+    # One writer (connection, taxonomy, ID caches) serves every state. Each
+    # state's jobs are cleaned and written on a background thread while the
+    # next state is fetched; at most one batch is in flight at a time.
+    writer = None
+    pending = None
+    try:
+        with ThreadPoolExecutor(max_workers=1) as db_pool:
+            for i, state_name in enumerate(states_today, 1):
+                city = TOP_CITIES_BY_STATE[state_name]
+                print(f"[{i}/{len(states_today)}] {state_name} ({city})")
+
+                if dry_run:
+                    print(f"  -> [DRY RUN] would fetch {pages} page(s)")
+                    actual_calls += pages
+                    continue
+
+                try:
+                    jobs = get_google_jobs(
+                        query=query,
+                        location=city,
+                        num_pages=pages,
+                    )
+                    total_jobs += len(jobs)
+                    actual_calls += min(pages, max(1, len(jobs) // 10 + 1))
+
+                    if jobs:
+                        _wait_for_write(pending, writer)
+                        if writer is None:
+                            writer = _JobDBWriter()
+                        pending = db_pool.submit(save_google_jobs_to_db, jobs, db=writer)
+
+                except Exception as e:
+                    print(f"  Error: {e}")
+
+                if i < len(states_today):
+                    time.sleep(SERP_DELAY_BETWEEN_STATES)
+    finally:
+        # Collect (or roll back) the last write even if the loop was interrupted
+        _wait_for_write(pending, writer)
+        if writer is not None:
+            writer.finish("Google Jobs Import")
 
     state["serp_monthly_calls"] += actual_calls
     state["serp_group"] = "B" if group_label == "A" else "A"
@@ -193,7 +224,7 @@ def run_serp(pages: int = 1, dry_run: bool = False):
 
 def run_muse(pages: int = 1, dry_run: bool = False):
     TOP_CITIES_BY_STATE, _, _, get_muse_jobs, _ = _get_collector()
-    from market_analyzer.collector import save_muse_jobs_to_db
+    from market_analyzer.collector import _JobDBWriter, save_muse_jobs_to_db
     ALL_STATES, _, _ = _get_state_groups()
 
     state = load_state()
@@ -230,33 +261,44 @@ def run_muse(pages: int = 1, dry_run: bool = False):
     else:
         states_to_run = ALL_STATES
 
-    all_jobs = []
-
-    for i, state_name in enumerate(states_to_run, 1):
-        city = TOP_CITIES_BY_STATE[state_name]
-        print(f"[{i}/{len(states_to_run)}] {state_name} ({city})")
-
-        if dry_run:
-            print(f"  -> [DRY RUN] would fetch {pages} page(s)")
-            continue
-
-        try:
-            jobs = get_muse_jobs(
-                category="Software Engineering",
-                location=city,
-                page_limit=pages,
-            )
-            all_jobs.extend(jobs)
-            print(f"  -> {len(jobs)} jobs")
-        except Exception as e:
-            print(f"  Error: {e}")
-
-        if i < len(states_to_run):
-            time.sleep(MUSE_DELAY_BETWEEN_STATES)
+    total_jobs = 0
 
-    if not dry_run and all_jobs:
-        print("\nCleaning and upserting to database...")
-        save_muse_jobs_to_db(all_jobs)
+    # Clean and upsert each state's jobs in the background while the next
+    # state is fetched, sharing one writer across the run
+    writer = None
+    pending = None
+    try:
+        with ThreadPoolExecutor(max_workers=1) as db_pool:
+            for i, state_name in enumerate(states_to_run, 1):
+                city = TOP_CITIES_BY_STATE[state_name]
+                print(f"[{i}/{len(states_to_run)}] {state_name} ({city})")
+
+                if dry_run:
+                    print(f"  -> [DRY RUN] would fetch {pages} page(s)")
+                    continue
+
+                try:
+                    jobs = get_muse_jobs(
+                        category="Software Engineering",
+                        location=city,
+                        page_limit=pages,
+                    )
+                    total_jobs += len(jobs)
+                    print(f"  -> {len(jobs)} jobs")
+
+                    if jobs:
+                        _wait_for_write(pending, writer)
+                        if writer is None:
+                            writer = _JobDBWriter()
+                        pending = db_pool.submit(save_muse_jobs_to_db, jobs, db=writer)
+                except Exception as e:
+                    print(f"  Error: {e}")
+
+    finally:
+        # Collect (or roll back) the last write even if the loop was interrupted
+        _wait_for_write(pending, writer)
+        if writer is not None:
+            writer.finish("Muse Jobs Import")
 
     actual_calls = len(states_to_run) * pages
     state["muse_monthly_calls"] += actual_calls
@@ -265,7 +307,7 @@ def run_muse(pages: int = 1, dry_run: bool = False):
         save_state(state)
 
     print(f"\n{'='*60}")
-    print(f"Muse Done: {len(all_jobs)} jobs collected, ~{actual_calls} API calls used")
+    print(f"Muse Done: {total_jobs} jobs collected, ~{actual_calls} API calls used")
     print(f"Monthly total: {state['muse_monthly_calls']}/250")
     print(f"{'='*60}\n")
 
@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 """Migration: Remove muse_company_id, muse_job_id, and clean_description columns.
 
-Copies clean_description into description, then rebuilds tables without the
-removed columns. Creates a backup before making changes.
+Copies clean_description into description, then drops the removed columns in
+place (SQLite 3.35+) or rebuilds the tables without them. Creates a backup
+before making changes.
 """
 
 import shutil
@@ -13,6 +14,109 @@ from pathlib import Path
 DB_PATH = Path(__file__).resolve().parent.parent / "data" / "market_analyzer.db"
 BACKUP_PATH = DB_PATH.with_suffix(f".backup-{datetime.now().strftime('%Y%m%d_%H%M%S')}.db")
 
+DROPPED_COLUMNS = [
+    ("companies", "muse_company_id"),
+    ("jobs", "muse_job_id"),
+    ("jobs", "clean_description"),
+]
+
+# Fallback for SQLite < 3.35 or constrained columns; both rebuilds run in one
+# exclusive transaction (executescript would otherwise commit after each block)
+REBUILD_SQL = """
+    BEGIN EXCLUSIVE;
+
+    CREATE TABLE companies_new (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE NOT NULL,
+        short_name TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    INSERT INTO companies_new (id, name, short_name, created_at, updated_at)
+        SELECT id, name, short_name, created_at, updated_at FROM companies;
+
+    DROP TABLE companies;
+    ALTER TABLE companies_new RENAME TO companies;
+
+    CREATE INDEX IF NOT EXISTS idx_companies_name ON companies(name);
+
+    CREATE TABLE jobs_new (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        company_id INTEGER NOT NULL,
+        description TEXT,
+        salary_min DECIMAL(10, 2),
+        salary_max DECIMAL(10, 2),
+        currency TEXT DEFAULT 'USD',
+        is_remote BOOLEAN DEFAULT 0,
+        job_level TEXT,
+        publication_date TIMESTAMP,
+        job_url TEXT,
+        fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        last_seen_at TIMESTAMP,
+        status TEXT DEFAULT 'open',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (company_id) REFERENCES companies(id)
+    );
+
+    INSERT INTO jobs_new (id, title, company_id, description, salary_min, salary_max,
+                          currency, is_remote, job_level, publication_date, job_url,
+                          fetched_at, last_seen_at, status, created_at, updated_at)
+        SELECT id, title, company_id,
+               COALESCE(clean_description, description),
+               salary_min, salary_max, currency, is_remote, job_level,
+               publication_date, job_url, fetched_at, last_seen_at, status,
+               created_at, updated_at
+        FROM jobs;
+
+    DROP TABLE jobs;
+    ALTER TABLE jobs_new RENAME TO jobs;
+
+    CREATE INDEX IF NOT EXISTS idx_jobs_company ON jobs(company_id);
+    CREATE INDEX IF NOT EXISTS idx_jobs_publication_date ON jobs(publication_date);
+    CREATE INDEX IF NOT EXISTS idx_jobs_remote ON jobs(is_remote);
+    CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status);
+    CREATE INDEX IF NOT EXISTS idx_jobs_last_seen_at ON jobs(last_seen_at);
+
+    COMMIT;
+"""
+
+
+def _indexes_on(conn, table: str, column: str):
+    """(index name, origin) for every index covering table.column; origin is
+    'c' for CREATE INDEX, 'u' for UNIQUE constraints, 'pk' for primary keys"""
+    for _, name, _, origin, _ in conn.execute(f"PRAGMA index_list({table})"):
+        if any(row[2] == column for row in conn.execute(f"PRAGMA index_info({name})")):
+            yield name, origin
+
+
+def _can_drop_in_place(conn) -> bool:
+    """ALTER TABLE DROP COLUMN needs SQLite 3.35+ and rejects PK/UNIQUE/FK columns"""
+    if sqlite3.sqlite_version_info < (3, 35, 0):
+        return False
+    for table, column in DROPPED_COLUMNS:
+        if any(origin != "c" for _, origin in _indexes_on(conn, table, column)):
+            return False
+        if any(fk[3] == column for fk in conn.execute(f"PRAGMA foreign_key_list({table})")):
+            return False
+    return True
+
+
+def _drop_in_place_sql(conn) -> str:
+    """Script that merges clean_description and drops the columns (plus any
+    plain indexes on them) inside one exclusive transaction"""
+    statements = [
+        "BEGIN EXCLUSIVE;",
+        "UPDATE jobs SET description = clean_description WHERE clean_description IS NOT NULL;",
+    ]
+    for table, column in DROPPED_COLUMNS:
+        statements.extend(f"DROP INDEX {name};" for name, _ in _indexes_on(conn, table, column))
+        statements.append(f"ALTER TABLE {table} DROP COLUMN {column};")
+    statements.append("COMMIT;")
+    return "\n".join(statements)
+
 
 def migrate():
     # Backup
@@ -22,67 +126,34 @@ def migrate():
 
     conn = sqlite3.connect(str(DB_PATH))
     conn.execute("PRAGMA foreign_keys = OFF")
-
-    print("Migrating companies table (dropping muse_company_id)...")
-    conn.executescript("""
-        CREATE TABLE companies_new (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT UNIQUE NOT NULL,
-            short_name TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-
-        INSERT INTO companies_new (id, name, short_name, created_at, updated_at)
-            SELECT id, name, short_name, created_at, updated_at FROM companies;
-
-        DROP TABLE companies;
-        ALTER TABLE companies_new RENAME TO companies;
-
-        CREATE INDEX IF NOT EXISTS idx_companies_name ON companies(name);
-    """)
-
-    print("Migrating jobs table (dropping muse_job_id, merging clean_description into description)...")
-    conn.executescript("""
-        CREATE TABLE jobs_new (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT NOT NULL,
-            company_id INTEGER NOT NULL,
-            description TEXT,
-            salary_min DECIMAL(10, 2),
-            salary_max DECIMAL(10, 2),
-            currency TEXT DEFAULT 'USD',
-            is_remote BOOLEAN DEFAULT 0,
-            job_level TEXT,
-            publication_date TIMESTAMP,
-            job_url TEXT,
-            fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            last_seen_at TIMESTAMP,
-            status TEXT DEFAULT 'open',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (company_id) REFERENCES companies(id)
-        );
-
-        INSERT INTO jobs_new (id, title, company_id, description, salary_min, salary_max,
-                              currency, is_remote, job_level, publication_date, job_url,
-                              fetched_at, last_seen_at, status, created_at, updated_at)
-            SELECT id, title, company_id,
-                   COALESCE(clean_description, description),
-                   salary_min, salary_max, currency, is_remote, job_level,
-                   publication_date, job_url, fetched_at, last_seen_at, status,
-                   created_at, updated_at
-            FROM jobs;
-
-        DROP TABLE jobs;
-        ALTER TABLE jobs_new RENAME TO jobs;
-
-        CREATE INDEX IF NOT EXISTS idx_jobs_company ON jobs(company_id);
-        CREATE INDEX IF NOT EXISTS idx_jobs_publication_date ON jobs(publication_date);
-        CREATE INDEX IF NOT EXISTS idx_jobs_remote ON jobs(is_remote);
-        CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status);
-        CREATE INDEX IF NOT EXISTS idx_jobs_last_seen_at ON jobs(last_seen_at);
-    """)
+    # A backup exists, so trade per-statement durability for fewer fsyncs
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA cache_size = -500000")
+
+    try:
+        dropped = False
+        if _can_drop_in_place(conn):
+            # SQLite 3.35+: drop the columns in place instead of copying both tables
+            print("Dropping muse_company_id, muse_job_id, and clean_description in place...")
+            try:
+                conn.executescript(_drop_in_place_sql(conn))
+                dropped = True
+            except sqlite3.OperationalError as e:
+                # e.g. a view or trigger still references a column
+                print(f"  In-place drop failed ({e}); falling back to table rebuild.")
+                if conn.in_transaction:
+                    conn.rollback()
+        if not dropped:
+            print("Rebuilding companies table (dropping muse_company_id) and jobs table "
+                  "(dropping muse_job_id, merging clean_description into description)...")
+            conn.executescript(REBUILD_SQL)
+    except sqlite3.Error:
+        if conn.in_transaction:
+            conn.rollback()
+        conn.close()
+        raise
 
     conn.execute("PRAGMA foreign_keys = ON")
     conn.close()
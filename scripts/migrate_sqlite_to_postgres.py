@@ -9,8 +9,13 @@ Defaults:
     postgres_url = DATABASE_URL env var or postgresql://localhost/market_analyzer
 """
 
+import re
 import sqlite3
+import struct
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from decimal import Decimal
 from pathlib import Path
 
 import psycopg2
@@ -18,22 +23,269 @@ import psycopg2
 ROOT_DIR = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT_DIR / "src"))
 from market_analyzer.db_config import DATABASE_URL
+from market_analyzer.db_queries import refresh_dashboard_stats
+from market_analyzer.skill_recommender import refresh_skill_counts
 
-TABLES_IN_ORDER = [
-    "companies",
-    "locations",
-    "skill_categories",
-    "skills",
-    "jobs",
-    "job_locations",
-    "job_skills",
+# Tables within a wave have no FK dependencies on each other and are copied
+# in parallel; waves run in order
+TABLE_WAVES = [
+    ["companies", "locations", "skill_categories", "skills"],
+    ["jobs"],
+    ["job_locations", "job_skills"],
 ]
+TABLES_IN_ORDER = [table for wave in TABLE_WAVES for table in wave]
+
+# Wide numeric/bool/timestamp tables (and the all-integer junction tables)
+# are copied in binary format; the small lookup tables stay in text format
+BINARY_COPY_TABLES = {"jobs", "job_locations", "job_skills"}
+
+FOLD_LOCATIONS_MIGRATION = ROOT_DIR / "migrations" / "008_add_locations_null_state_unique_index.sql"
+
+_INDEX_DDL = re.compile(r"^\s*CREATE\s+(UNIQUE\s+)?INDEX\b", re.IGNORECASE | re.MULTILINE)
+
+
+def _copy_value(val) -> str:
+    """Format one value for COPY ... FROM STDIN text format"""
+    if val is None:
+        return "\\N"
+    if isinstance(val, bool):
+        return "t" if val else "f"
+    return (
+        str(val)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+class _BinaryUnsupported(ValueError):
+    """A value cannot be encoded for binary COPY; the table is retried as text"""
+
+
+_PG_EPOCH = datetime(2000, 1, 1)
+_BINARY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+_BINARY_TRAILER = struct.pack(">h", -1)
+_NULL_FIELD = struct.pack(">i", -1)
+
+
+def _binary_int(val) -> bytes:
+    return struct.pack(">ii", 4, int(val))
+
+
+def _binary_bool(val) -> bytes:
+    return struct.pack(">i?", 1, bool(val))
+
+
+def _binary_text(val) -> bytes:
+    data = str(val).encode()
+    return struct.pack(">i", len(data)) + data
+
+
+def _binary_numeric(val) -> bytes:
+    """NUMERIC wire format: base-10000 digit groups with weight, sign and scale"""
+    sign, digits, exp = Decimal(str(val)).as_tuple()
+    if not isinstance(exp, int):
+        raise _BinaryUnsupported(f"non-finite numeric {val!r}")
+    dscale = max(0, -exp)
+    text = "".join(map(str, digits)).ljust(len(digits) + max(0, exp), "0")
+    # Pad both sides so the decimal point falls on a 4-digit group boundary
+    text = text.rjust(dscale + 1, "0")
+    int_len = len(text) - dscale
+    text = "0" * (-int_len % 4) + text + "0" * (-dscale % 4)
+    groups = [int(text[i:i + 4]) for i in range(0, len(text), 4)]
+    weight = (int_len + -int_len % 4) // 4 - 1
+    while groups and groups[0] == 0:
+        groups.pop(0)
+        weight -= 1
+    while groups and groups[-1] == 0:
+        groups.pop()
+    if not groups:
+        weight = 0
+    body = struct.pack(f">hhHH{len(groups)}H", len(groups), weight,
+                       0x4000 if sign else 0, dscale, *groups)
+    return struct.pack(">i", len(body)) + body
+
+
+def _binary_timestamp(val) -> bytes:
+    """TIMESTAMP wire format: int8 microseconds since 2000-01-01"""
+    try:
+        dt = val if isinstance(val, datetime) else datetime.fromisoformat(str(val))
+    except ValueError as e:
+        raise _BinaryUnsupported(str(e)) from e
+    # timestamp without time zone ignores an input offset, as text input does
+    delta = dt.replace(tzinfo=None) - _PG_EPOCH
+    micros = (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+    return struct.pack(">iq", 8, micros)
+
+
+_BINARY_ENCODERS = {
+    "integer": _binary_int,
+    "boolean": _binary_bool,
+    "text": _binary_text,
+    "numeric": _binary_numeric,
+    "timestamp without time zone": _binary_timestamp,
+}
+
+
+def _text_row_formatter(columns):
+    # Convert SQLite 0/1 booleans for is_remote
+    bool_cols = {i for i, col in enumerate(columns) if col == "is_remote"}
+
+    def format_row(row):
+        values = [
+            _copy_value(bool(val) if i in bool_cols and val is not None else val)
+            for i, val in enumerate(row)
+        ]
+        return "\t".join(values) + "\n"
+    return format_row
+
+
+def _binary_row_formatter(columns, pg_types):
+    encoders = [_BINARY_ENCODERS[pg_types[col]] for col in columns]
+    field_count = struct.pack(">h", len(columns))
+
+    def format_row(row):
+        try:
+            return field_count + b"".join(
+                _NULL_FIELD if val is None else encode(val)
+                for encode, val in zip(encoders, row)
+            )
+        except (TypeError, ValueError, struct.error) as e:
+            raise _BinaryUnsupported(str(e)) from e
+    return format_row
+
+
+class _CopyStream:
+    """File-like reader that formats SQLite rows as COPY data on demand"""
+
+    def __init__(self, rows, format_row, header="", trailer=""):
+        self._lines = self._generate(rows, format_row, trailer)
+        self._buf = header
+        self._empty = header[:0]
+        self.rows = 0
+        # psycopg2 reports a failed read() as QueryCanceled; keep the cause
+        self.error = None
+
+    def _generate(self, rows, format_row, trailer):
+        for row in rows:
+            self.rows += 1
+            yield format_row(row)
+        if trailer:
+            yield trailer
+
+    def read(self, size=-1):
+        chunks = [self._buf]
+        length = len(self._buf)
+        while size < 0 or length < size:
+            try:
+                line = next(self._lines, None)
+            except Exception as e:
+                self.error = e
+                raise
+            if line is None:
+                break
+            chunks.append(line)
+            length += len(line)
+        data = self._empty.join(chunks)
+        if size < 0:
+            self._buf = self._empty
+            return data
+        self._buf = data[size:]
+        return data[:size]
+
+
+def _split_schema(schema_sql: str) -> tuple[str, str]:
+    """Split schema.sql into (table DDL, secondary index DDL)"""
+    table_sql, index_sql = [], []
+    # Drop line comments first so a ';' inside one cannot split a statement
+    schema_sql = re.sub(r"--[^\n]*", "", schema_sql)
+    for stmt in schema_sql.split(";"):
+        if not stmt.strip():
+            continue
+        (index_sql if _INDEX_DDL.search(stmt) else table_sql).append(stmt.strip() + ";")
+    return "\n".join(table_sql), "\n".join(index_sql)
+
+
+def _connect_sqlite(sqlite_path: str) -> sqlite3.Connection:
+    # SQLite is only read: open it read-only with a large page cache and
+    # memory-mapped I/O so the table scans avoid extra copies
+    sq = sqlite3.connect(f"{Path(sqlite_path).resolve().as_uri()}?mode=ro", uri=True)
+    sq.executescript(
+        "PRAGMA query_only = ON;"
+        "PRAGMA cache_size = -200000;"
+        "PRAGMA mmap_size = 268435456;"
+        "PRAGMA temp_store = MEMORY;"
+    )
+    return sq
+
+
+def _pg_column_types(pg_cur, table: str) -> dict:
+    pg_cur.execute(
+        "SELECT column_name, data_type FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = %s "
+        # Generated columns (e.g. search_tsv) are computed, never copied
+        "AND is_generated = 'NEVER'",
+        (table,),
+    )
+    return dict(pg_cur.fetchall())
+
+
+def _copy_table(sq, pg_cur, table: str, binary_types=None) -> int:
+    """COPY one table, in binary format when its PostgreSQL column types are given"""
+    # Stream rows from the SQLite cursor into COPY so only one read
+    # buffer of the table is held in memory at a time
+    sq_cur = sq.execute(f"SELECT * FROM {table}")
+    columns = [d[0] for d in sq_cur.description]
+    col_list = ", ".join(columns)
+
+    if binary_types:
+        stream = _CopyStream(sq_cur, _binary_row_formatter(columns, binary_types),
+                             _BINARY_HEADER, _BINARY_TRAILER)
+        try:
+            pg_cur.copy_expert(f"COPY {table} ({col_list}) FROM STDIN WITH (FORMAT BINARY)", stream)
+        except psycopg2.Error:
+            if isinstance(stream.error, _BinaryUnsupported):
+                raise stream.error
+            raise
+    else:
+        stream = _CopyStream(sq_cur, _text_row_formatter(columns))
+        pg_cur.copy_expert(f"COPY {table} ({col_list}) FROM STDIN", stream)
+    return stream.rows
+
+
+def migrate_table(sqlite_path: str, pg_url: str, table: str) -> int:
+    """Copy one table on its own SQLite and PostgreSQL connections; returns row count"""
+    sq = _connect_sqlite(sqlite_path)
+    pg = psycopg2.connect(pg_url)
+    try:
+        pg_cur = pg.cursor()
+        # Disable FK checks during import (session-scoped, so set per connection)
+        pg_cur.execute("SET session_replication_role = 'replica'")
+
+        binary_types = None
+        if table in BINARY_COPY_TABLES:
+            pg_types = _pg_column_types(pg_cur, table)
+            if set(pg_types.values()) <= _BINARY_ENCODERS.keys():
+                binary_types = pg_types
+        try:
+            rows = _copy_table(sq, pg_cur, table, binary_types)
+        except _BinaryUnsupported as e:
+            # Text input is more lenient (e.g. timestamp spellings); retry as text
+            print(f"  {table:20} binary COPY unsupported ({e}); using text")
+            pg.rollback()
+            pg_cur.execute("SET session_replication_role = 'replica'")
+            rows = _copy_table(sq, pg_cur, table)
+        pg.commit()
+        return rows
+    finally:
+        sq.close()
+        pg.close()
 
 
 def migrate(sqlite_path: str, pg_url: str):
-    # Connect to both databases
-    sq = sqlite3.connect(sqlite_path)
-    sq.row_factory = sqlite3.Row
+    # Fail fast on a missing/unreadable SQLite file before touching PostgreSQL
+    _connect_sqlite(sqlite_path).close()
     pg = psycopg2.connect(pg_url)
     pg_cur = pg.cursor()
 
@@ -46,80 +298,82 @@ def migrate(sqlite_path: str, pg_url: str):
     schema_path = ROOT_DIR / "data" / "schema.sql"
     print(f"Creating schema from {schema_path} ...")
     with open(schema_path) as f:
-        pg_cur.execute(f.read())
+        schema_sql, post_load_sql = _split_schema(f.read())
+    # Secondary indexes are built once after the load instead of being
+    # maintained row by row during COPY
+    pg_cur.execute(schema_sql)
     pg.commit()
 
-    # Disable FK checks during import (re-enabled at end of transaction)
-    pg_cur.execute("SET session_replication_role = 'replica'")
-
-    # Migrate each table
-    for table in TABLES_IN_ORDER:
-        rows = sq.execute(f"SELECT * FROM {table}").fetchall()
-        if not rows:
-            print(f"  {table:20} 0 rows (skipped)")
-            continue
-
-        columns = rows[0].keys()
-        col_list = ", ".join(columns)
-        placeholders = ", ".join(["%s"] * len(columns))
-        insert_sql = f"INSERT INTO {table} ({col_list}) VALUES ({placeholders})"
-
-        batch = []
-        for row in rows:
-            values = []
-            for col in columns:
-                val = row[col]
-                # Convert SQLite 0/1 booleans for is_remote
-                if col == "is_remote" and val is not None:
-                    val = bool(val)
-                values.append(val)
-            batch.append(tuple(values))
-
-        pg_cur.executemany(insert_sql, batch)
-        pg.commit()
-        print(f"  {table:20} {len(batch):>6} rows")
-
-    # Re-enable FK checks
-    pg_cur.execute("SET session_replication_role = 'origin'")
-    pg.commit()
+    # Migrate each wave of tables in parallel, one connection pair per table
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        for wave in TABLE_WAVES:
+            counts = pool.map(lambda table: migrate_table(sqlite_path, pg_url, table), wave)
+            for table, rows in zip(wave, counts):
+                if rows == 0:
+                    print(f"  {table:20} 0 rows (skipped)")
+                else:
+                    print(f"  {table:20} {rows:>6} rows")
 
     # Clean up orphan references from SQLite (which didn't enforce FKs)
     print("\nCleaning orphan references ...")
+    # One anti-join per junction table covers both of its foreign keys
     pg_cur.execute(
-        "DELETE FROM job_locations WHERE location_id NOT IN (SELECT id FROM locations)"
+        "DELETE FROM job_locations jl "
+        "WHERE NOT EXISTS (SELECT 1 FROM locations l WHERE l.id = jl.location_id) "
+        "OR NOT EXISTS (SELECT 1 FROM jobs j WHERE j.id = jl.job_id)"
     )
     print(f"  job_locations: removed {pg_cur.rowcount} orphan rows")
     pg_cur.execute(
-        "DELETE FROM job_locations WHERE job_id NOT IN (SELECT id FROM jobs)"
-    )
-    print(f"  job_locations: removed {pg_cur.rowcount} orphan job rows")
-    pg_cur.execute(
-        "DELETE FROM job_skills WHERE job_id NOT IN (SELECT id FROM jobs)"
-    )
-    print(f"  job_skills: removed {pg_cur.rowcount} orphan job rows")
-    pg_cur.execute(
-        "DELETE FROM job_skills WHERE skill_id NOT IN (SELECT id FROM skills)"
+        "DELETE FROM job_skills js "
+        "WHERE NOT EXISTS (SELECT 1 FROM jobs j WHERE j.id = js.job_id) "
+        "OR NOT EXISTS (SELECT 1 FROM skills s WHERE s.id = js.skill_id)"
     )
-    print(f"  job_skills: removed {pg_cur.rowcount} orphan skill rows")
+    print(f"  job_skills: removed {pg_cur.rowcount} orphan rows")
+    pg.commit()
+
+    # SQLite's UNIQUE(city, state, country) let stateless locations (e.g.
+    # Remote) repeat; fold them into the lowest id as migration 008 does, or
+    # the unique index below would reject the loaded rows
+    print("\nFolding duplicate stateless locations ...")
+    pg_cur.execute(FOLD_LOCATIONS_MIGRATION.read_text())
+    pg.commit()
+
+    print("\nCreating indexes ...")
+    pg_cur.execute(post_load_sql)
+    pg.commit()
+
+    print("\nRefreshing skill co-occurrence and dashboard views ...")
+    refresh_skill_counts(pg_cur)
+    refresh_dashboard_stats(pg_cur)
+    pg.commit()
+
+    # Freshly loaded tables have no planner statistics until autovacuum gets
+    # to them; collect them now so the first queries plan their joins well
+    print("\nAnalyzing tables ...")
+    pg_cur.execute(f"ANALYZE {', '.join(TABLES_IN_ORDER)}")
     pg.commit()
 
     # Reset sequences so new INSERTs get correct IDs
     print("\nResetting sequences ...")
-    for table in TABLES_IN_ORDER:
+    pg_cur.execute(
+        "SELECT table_name, column_name, pg_get_serial_sequence(table_name, column_name) "
+        "FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = ANY(%s) "
+        "AND column_default LIKE 'nextval%%'",
+        (TABLES_IN_ORDER,),
+    )
+    seq_cols = pg_cur.fetchall()
+    if seq_cols:
+        # One statement resets every sequence instead of a round-trip per table
         pg_cur.execute(
-            f"SELECT column_name FROM information_schema.columns "
-            f"WHERE table_name = %s AND column_default LIKE 'nextval%%'",
-            (table,),
+            "SELECT " + ", ".join(
+                f"setval(%s, COALESCE((SELECT MAX({col}) FROM {table}), 1))"
+                for table, col, _ in seq_cols
+            ),
+            [seq for _, _, seq in seq_cols],
         )
-        seq_cols = pg_cur.fetchall()
-        for (col,) in seq_cols:
-            pg_cur.execute(
-                f"SELECT setval(pg_get_serial_sequence('{table}', '{col}'), "
-                f"COALESCE((SELECT MAX({col}) FROM {table}), 1))"
-            )
     pg.commit()
 
-    sq.close()
     pg.close()
     print("\nMigration complete!")
 
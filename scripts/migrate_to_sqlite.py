@@ -4,13 +4,16 @@ Migration script: Convert processed_jobs.csv to PostgreSQL database
 Normalizes data into the new schema structure
 """
 
-import csv
+import ast
 import json
+import re
 import sys
 from pathlib import Path
 from datetime import datetime
+from functools import lru_cache
 from typing import Dict, Tuple, List, Optional
 
+import pandas as pd
 import psycopg2
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
@@ -18,9 +21,49 @@ ROOT_DIR = Path(__file__).resolve().parent.parent
 # Allow importing db_config when run as a script
 sys.path.insert(0, str(ROOT_DIR / "src"))
 from market_analyzer.db_config import DATABASE_URL
+from market_analyzer.db_queries import refresh_dashboard_stats
+from market_analyzer.db_writes import JobBatch, LookupCache, location_key
+from market_analyzer.skill_recommender import refresh_skill_counts
+
+
+# "$97,500.00 - $134,700.00" or "$75000"
+_SALARY_RANGE = re.compile(
+    r'\s*\$?\s*(\d[\d,]*(?:\.\d+)?)\s*(?:[-–]\s*\$?\s*(\d[\d,]*(?:\.\d+)?))?\s*'
+)
+_STRIP_COMMAS = str.maketrans("", "", ",")
+
+
+@lru_cache(maxsize=4096)
+def _parse_location_key(location_str: Optional[str], is_remote: bool) -> Tuple[str, Optional[str], str]:
+    """Split 'City, ST' into a (city, state, country) cache key; memoized since locations repeat across jobs"""
+    city = "Remote" if is_remote else "Unknown"
+    state = None
+
+    if location_str and "," in location_str:
+        parts = location_str.split(",")
+        city = parts[0].strip()
+        state = parts[1].strip() if len(parts) > 1 else None
+
+    return location_key(city, state)
+
+
+def _location_name(location_item) -> Optional[str]:
+    """Handle both dict format {'name': 'New York, NY'} and string format"""
+    return location_item.get('name') if isinstance(location_item, dict) else location_item
 
 
 class DatabaseMigrator:
+    CSV_CHUNK_SIZE = 10_000
+    JOB_BATCH_SIZE = 500
+    SKILL_CATEGORIES = [
+        "Languages", "Frameworks_Libs", "Tools_Infrastructure", "Concepts", "Soft_Skills"
+    ]
+    # Only these CSV columns are imported; raw HTML and other columns are never parsed
+    CSV_COLUMNS = frozenset([
+        "id", "name", "company.name", "company.short_name", "clean_description",
+        "salary", "publication_date", "is_remote", "refs.landing_page", "locations",
+    ] + [f"skills_{category}" for category in SKILL_CATEGORIES])
+
     def __init__(self, db_url: str = None, csv_path: str = None):
         if db_url is None:
             db_url = DATABASE_URL
@@ -33,10 +76,11 @@ class DatabaseMigrator:
         self.run_timestamp = datetime.now().isoformat()
 
         # Cache for IDs to avoid duplicate lookups
-        self.company_cache: Dict[str, int] = {}
-        self.location_cache: Dict[Tuple, int] = {}
-        self.skill_cache: Dict[Tuple[str, str], int] = {}  # (skill_name, category) -> id
-        self.skill_category_cache: Dict[str, int] = {}
+        self.lookups = LookupCache()
+        self.company_cache: Dict[str, int] = self.lookups.companies
+        self.location_cache: Dict[Tuple, int] = self.lookups.locations
+        self.skill_cache: Dict[Tuple[str, str], int] = self.lookups.skills  # (skill_name, category) -> id
+        self.skill_category_cache: Dict[str, int] = self.lookups.categories
 
         # Statistics
         self.stats = {
@@ -69,60 +113,36 @@ class DatabaseMigrator:
         self.conn.commit()
         print("✓ Database schema initialized")
 
-    def get_or_create_skill_category(self, category_name: str) -> int:
-        """Get or create skill category and return ID"""
-        if category_name in self.skill_category_cache:
-            return self.skill_category_cache[category_name]
+        self.preload_caches()
 
-        self.cursor.execute(
-            "SELECT id FROM skill_categories WHERE name = %s",
-            (category_name,)
-        )
-        result = self.cursor.fetchone()
+    def preload_caches(self):
+        """Seed the lookup caches from existing rows so cache misses only occur for new values"""
+        self.lookups.load(self.cursor)
 
-        if result:
-            category_id = result[0]
-        else:
-            self.cursor.execute(
-                "INSERT INTO skill_categories (name) VALUES (%s) RETURNING id",
-                (category_name,)
-            )
-            category_id = self.cursor.fetchone()[0]
-            self.stats["skills_created"] += 1
+    def create_lookups(self, companies=(), location_keys=(), skill_keys=(), category_names=()):
+        """Create whatever the caches are missing and count the new rows"""
+        created = self.lookups.create_missing(
+            self.cursor, companies, location_keys, skill_keys, category_names
+        )
+        self.stats["companies_created"] += created["companies"]
+        self.stats["locations_created"] += created["locations"]
+        self.stats["skills_created"] += created["categories"]
 
-        self.skill_category_cache[category_name] = category_id
-        return category_id
+    def get_or_create_skill_category(self, category_name: str) -> int:
+        """Get or create skill category and return ID"""
+        if category_name not in self.skill_category_cache:
+            self.create_lookups(category_names=[category_name])
+        return self.skill_category_cache[category_name]
 
     def get_or_create_skill(self, skill_name: str, category_name: str) -> int:
         """Get or create skill and return ID"""
         if not skill_name or not skill_name.strip():
             return None
 
-        skill_name = skill_name.strip()
-        key = (skill_name, category_name)
-
-        if key in self.skill_cache:
-            return self.skill_cache[key]
-
-        category_id = self.get_or_create_skill_category(category_name)
-
-        self.cursor.execute(
-            "SELECT id FROM skills WHERE name = %s AND category_id = %s",
-            (skill_name, category_id)
-        )
-        result = self.cursor.fetchone()
-
-        if result:
-            skill_id = result[0]
-        else:
-            self.cursor.execute(
-                "INSERT INTO skills (name, category_id) VALUES (%s, %s) RETURNING id",
-                (skill_name, category_id)
-            )
-            skill_id = self.cursor.fetchone()[0]
-
-        self.skill_cache[key] = skill_id
-        return skill_id
+        key = (skill_name.strip(), category_name)
+        if key not in self.skill_cache:
+            self.create_lookups(skill_keys=[key])
+        return self.skill_cache[key]
 
     def get_or_create_company(self, company_data: Dict) -> int:
         """Get or create company and return ID"""
@@ -131,229 +151,210 @@ class DatabaseMigrator:
         if not company_name or company_name == "Unknown":
             return None
 
-        if company_name in self.company_cache:
-            return self.company_cache[company_name]
-
-        self.cursor.execute(
-            "SELECT id FROM companies WHERE name = %s",
-            (company_name,)
-        )
-        result = self.cursor.fetchone()
-
-        if result:
-            company_id = result[0]
-        else:
-            self.cursor.execute(
-                "INSERT INTO companies (name, short_name) VALUES (%s, %s) RETURNING id",
-                (
-                    company_name,
-                    company_data.get("company.short_name", "")
-                )
-            )
-            company_id = self.cursor.fetchone()[0]
-            self.stats["companies_created"] += 1
-
-        self.company_cache[company_name] = company_id
-        return company_id
+        if company_name not in self.company_cache:
+            self.create_lookups(companies=[(company_name, company_data.get("company.short_name", ""))])
+        return self.company_cache[company_name]
 
     def get_or_create_location(self, job_city: List[str], is_remote: bool) -> int:
         """Get or create location and return ID"""
         # Parse location from job_city (stored as list of dicts in CSV)
-        city = "Remote" if is_remote else "Unknown"
-        state = None
-
+        location_str = None
         if job_city and isinstance(job_city, list) and len(job_city) > 0:
-            location_item = job_city[0]
-            # Handle both dict format {'name': 'New York, NY'} and string format
-            location_str = location_item.get('name') if isinstance(location_item, dict) else location_item
-            if location_str and "," in location_str:
-                parts = location_str.split(",")
-                city = parts[0].strip()
-                state = parts[1].strip() if len(parts) > 1 else None
-
-        location_key = (city, state, "USA")
-
-        if location_key in self.location_cache:
-            return self.location_cache[location_key]
-
-        self.cursor.execute(
-            "SELECT id FROM locations WHERE city = %s AND state = %s AND country = %s",
-            location_key
-        )
-        result = self.cursor.fetchone()
-
-        if result:
-            location_id = result[0]
-        else:
-            self.cursor.execute(
-                "INSERT INTO locations (city, state, country) VALUES (%s, %s, %s) RETURNING id",
-                location_key
-            )
-            location_id = self.cursor.fetchone()[0]
-            self.stats["locations_created"] += 1
+            location_str = _location_name(job_city[0])
 
-        self.location_cache[location_key] = location_id
-        return location_id
+        location_key = _parse_location_key(location_str, is_remote)
+        if location_key not in self.location_cache:
+            self.create_lookups(location_keys=[location_key])
+        return self.location_cache[location_key]
 
     def parse_salary(self, salary_str: str) -> Tuple[Optional[float], Optional[float]]:
         """Parse salary range from string like '$97,500.00 - $134,700.00'"""
-        if not salary_str or salary_str.strip() == "":
+        if not salary_str:
             return None, None
 
-        try:
-            parts = salary_str.split("-")
-            salary_min = float(parts[0].replace("$", "").replace(",", "").strip())
-            salary_max = float(parts[1].replace("$", "").replace(",", "").strip()) if len(parts) > 1 else None
-            return salary_min, salary_max
-        except (ValueError, IndexError):
+        match = _SALARY_RANGE.fullmatch(salary_str)
+        if not match:
             return None, None
 
+        low, high = match.groups()
+        salary_min = float(low.translate(_STRIP_COMMAS))
+        salary_max = float(high.translate(_STRIP_COMMAS)) if high else None
+        return salary_min, salary_max
+
     def parse_skills_json(self, skills_json_str: str) -> Dict[str, List[str]]:
-        """Parse skills JSON from CSV"""
-        if not skills_json_str or skills_json_str.strip() == "":
+        """Parse a stringified dict/list column (skills, locations) from CSV"""
+        if isinstance(skills_json_str, (list, dict)):
+            return skills_json_str
+        if not isinstance(skills_json_str, str) or skills_json_str.strip() == "":
             return {}
 
+        # process_dataset writes JSON; older CSVs hold Python reprs (from pandas),
+        # which literal_eval parses with apostrophes inside values intact
         try:
-            return json.loads(skills_json_str.replace("'", '"'))
+            return json.loads(skills_json_str)
         except json.JSONDecodeError:
+            pass
+        try:
+            return ast.literal_eval(skills_json_str)
+        except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
             return {}
 
+    @staticmethod
+    def row_is_remote(row: Dict) -> bool:
+        """migrate() coerces the column per chunk; other callers may pass strings"""
+        is_remote = row.get("is_remote", "")
+        if not isinstance(is_remote, bool):
+            is_remote = str(is_remote).lower() == "true"
+        return is_remote
+
+    def row_locations(self, row: Dict, is_remote: bool) -> List:
+        """All location entries for a row, falling back to Remote for remote jobs"""
+        job_cities = self.parse_skills_json(row.get("locations", "[]"))
+
+        # If no explicit locations but job is remote, create remote location
+        if not job_cities and is_remote:
+            job_cities = [{"name": "Remote"}]
+        return job_cities
+
+    def row_skills(self, row: Dict) -> List[Tuple[str, str]]:
+        """(skill_name, category) pairs listed in a row's skills_* columns"""
+        pairs = []
+        for category in self.SKILL_CATEGORIES:
+            category_key = f"skills_{category}"
+            if category_key in row:
+                skills_list = self.parse_skills_json(row.get(category_key, "[]"))
+                if isinstance(skills_list, list):
+                    pairs.extend((skill_name, category) for skill_name in skills_list)
+        return pairs
+
+    def bulk_create_lookups(self, rows: List[Dict]):
+        """Upsert every company, category, skill, and location a batch of rows
+        references with one statement per table, so import_job only hits the caches"""
+        companies = {}
+        location_keys = set()
+        skill_keys = set()
+        for row in rows:
+            company_name = row.get("company.name", "Unknown")
+            if company_name and company_name != "Unknown" and company_name not in self.company_cache:
+                companies.setdefault(company_name, row.get("company.short_name", ""))
+
+            try:
+                is_remote = self.row_is_remote(row)
+                for job_city in self.row_locations(row, is_remote):
+                    key = _parse_location_key(_location_name(job_city), is_remote)
+                    if key not in self.location_cache:
+                        location_keys.add(key)
+
+                for skill_name, category in self.row_skills(row):
+                    if isinstance(skill_name, str) and skill_name.strip():
+                        key = (skill_name.strip(), category)
+                        if key not in self.skill_cache:
+                            skill_keys.add(key)
+            except Exception:
+                # Malformed rows are reported by import_job itself
+                continue
+
+        self.create_lookups(companies.items(), location_keys, skill_keys)
+
+    def prepare_job(self, row: Dict) -> Optional[Tuple[tuple, List[int], List[int]]]:
+        """Resolve a CSV row into (jobs values, location ids, skill ids); None if unusable"""
+        external_job_id = str(row.get("id", ""))
+        if not external_job_id:
+            return None
+
+        # Get or create company
+        company_id = self.get_or_create_company(row)
+        if not company_id:
+            return None
+
+        # Parse salary
+        salary_min, salary_max = self.parse_salary(row.get("salary", ""))
+
+        # Parse publication date
+        pub_date = row.get("publication_date", "")
+        is_remote = self.row_is_remote(row)
+
+        job_values = (
+            external_job_id,
+            row.get("name", ""),
+            company_id,
+            row.get("clean_description", ""),
+            salary_min,
+            salary_max,
+            is_remote,
+            pub_date if pub_date else None,
+            row.get("refs.landing_page", ""),
+            self.run_timestamp,
+            self.run_timestamp
+        )
+
+        # Get or create ALL locations for the job
+        location_ids = []
+        for job_city in self.row_locations(row, is_remote):
+            location_id = self.get_or_create_location([job_city], is_remote)
+            if location_id:
+                location_ids.append(location_id)
+
+        # Get or create skills
+        skill_ids = []
+        for skill_name, category in self.row_skills(row):
+            skill_id = self.get_or_create_skill(skill_name, category)
+            if skill_id:
+                skill_ids.append(skill_id)
+
+        return job_values, location_ids, skill_ids
+
+    def job_batch(self) -> JobBatch:
+        """Batch writer for prepared jobs, counting into this migrator's stats"""
+        return JobBatch(self.cursor, self.stats, self.JOB_BATCH_SIZE, links_stat="job_skills_created")
+
+    def import_jobs(self, rows: List[Dict]) -> int:
+        """Import a batch of rows, writing jobs in groups of JOB_BATCH_SIZE; returns rows imported"""
+        batch = self.job_batch()
+        for row in rows:
+            try:
+                prepared = self.prepare_job(row)
+            except Exception as e:
+                print(f"✗ Error importing job {row.get('id')}: {e}")
+                self.stats["errors"] += 1
+                continue
+            if prepared is not None:
+                batch.add(*prepared)
+
+        batch.flush()
+        return batch.written
+
     def import_job(self, row: Dict) -> bool:
         """Import single job row - UPSERT if exists, INSERT if new"""
         try:
-            external_job_id = str(row.get("id", ""))
-            if not external_job_id:
-                return False
-
-            # Get or create company
-            company_id = self.get_or_create_company(row)
-            if not company_id:
-                return False
-
-            # Parse salary
-            salary_min, salary_max = self.parse_salary(row.get("salary", ""))
-
-            # Parse publication date
-            pub_date = row.get("publication_date", "")
-            is_remote = row.get("is_remote", "").lower() == "true" or row.get("is_remote") == True
-
-            # Check if job already exists by external ID
-            self.cursor.execute("SELECT id FROM jobs WHERE external_job_id = %s", (external_job_id,))
-            existing_job = self.cursor.fetchone()
-
-            if existing_job:
-                # UPSERT: Update existing job
-                job_id = existing_job[0]
-                self.cursor.execute(
-                    """UPDATE jobs SET
-                        title = %s, company_id = %s, description = %s,
-                        salary_min = %s, salary_max = %s, is_remote = %s, publication_date = %s,
-                        job_url = %s, fetched_at = %s, updated_at = %s, status = 'open', last_seen_at = %s
-                        WHERE id = %s""",
-                    (
-                        row.get("name", ""),
-                        company_id,
-                        row.get("clean_description", ""),
-                        salary_min,
-                        salary_max,
-                        is_remote,
-                        pub_date if pub_date else None,
-                        row.get("refs.landing_page", ""),
-                        self.run_timestamp,
-                        self.run_timestamp,
-                        self.run_timestamp,
-                        job_id
-                    )
-                )
-                self.stats["jobs_updated"] += 1
-            else:
-                # INSERT: New job
-                self.cursor.execute(
-                    """INSERT INTO jobs (
-                        external_job_id, title, company_id, description,
-                        salary_min, salary_max, is_remote, publication_date, job_url,
-                        fetched_at, last_seen_at, status
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'open')
-                    RETURNING id""",
-                    (
-                        external_job_id,
-                        row.get("name", ""),
-                        company_id,
-                        row.get("clean_description", ""),
-                        salary_min,
-                        salary_max,
-                        is_remote,
-                        pub_date if pub_date else None,
-                        row.get("refs.landing_page", ""),
-                        self.run_timestamp,
-                        self.run_timestamp
-                    )
-                )
-                job_id = self.cursor.fetchone()[0]
-                self.stats["jobs_imported"] += 1
-
-            # Get or create ALL locations and link them to the job
-            job_city_str = row.get("locations", "[]")
-            try:
-                job_cities = json.loads(job_city_str.replace("'", '"'))
-            except:
-                job_cities = []
-
-            # If no explicit locations but job is remote, create remote location
-            if not job_cities and is_remote:
-                job_cities = [{"name": "Remote"}]
-
-            # Process all locations for this job
-            for job_city in job_cities:
-                location_id = self.get_or_create_location([job_city], is_remote)
-                if location_id:
-                    self.cursor.execute(
-                        """INSERT INTO job_locations (job_id, location_id) VALUES (%s, %s)
-                           ON CONFLICT DO NOTHING""",
-                        (job_id, location_id)
-                    )
-
-            # Parse and insert skills
-            skills_data = self.parse_skills_json(row.get("skills_data", "{}"))
-            skill_categories = [
-                "Languages", "Frameworks_Libs", "Tools_Infrastructure", "Concepts", "Soft_Skills"
-            ]
-
-            for category in skill_categories:
-                category_key = f"skills_{category}"
-                if category_key in row:
-                    skills_list = self.parse_skills_json(row.get(category_key, "[]"))
-                    if isinstance(skills_list, list):
-                        for skill_name in skills_list:
-                            skill_id = self.get_or_create_skill(skill_name, category)
-                            if skill_id:
-                                self.cursor.execute(
-                                    """INSERT INTO job_skills (job_id, skill_id) VALUES (%s, %s)
-                                       ON CONFLICT DO NOTHING""",
-                                    (job_id, skill_id)
-                                )
-                                self.stats["job_skills_created"] += 1
-
-            return True
-
+            prepared = self.prepare_job(row)
         except Exception as e:
             print(f"✗ Error importing job {row.get('id')}: {e}")
             self.stats["errors"] += 1
             return False
+        if prepared is None:
+            return False
+        batch = self.job_batch()
+        batch.add(*prepared)
+        batch.flush()
+        return batch.written == 1
 
     def mark_closed_jobs(self):
-        """Mark jobs as closed if they weren't seen in this run"""
+        """Mark jobs as closed if they weren't seen in this run (committed by the caller)"""
+        self.cursor.execute("SAVEPOINT mark_closed")
         try:
             self.cursor.execute(
                 """UPDATE jobs SET status = 'closed', updated_at = %s
-                   WHERE status = 'open' AND (last_seen_at IS NULL OR last_seen_at < %s)""",
+                   WHERE status = 'open'
+                     AND COALESCE(last_seen_at, '-infinity'::timestamp) < %s""",
                 (self.run_timestamp, self.run_timestamp)
             )
             self.stats["jobs_closed"] = self.cursor.rowcount
-            self.conn.commit()
+            self.cursor.execute("RELEASE SAVEPOINT mark_closed")
             if self.stats["jobs_closed"] > 0:
                 print(f"✓ Marked {self.stats['jobs_closed']} jobs as closed")
         except Exception as e:
+            self.cursor.execute("ROLLBACK TO SAVEPOINT mark_closed")
             print(f"✗ Error marking closed jobs: {e}")
 
     def migrate(self):
@@ -368,21 +369,46 @@ class DatabaseMigrator:
         if not csv_path.exists():
             raise FileNotFoundError(f"{self.csv_path} not found")
 
-        # Read and import CSV
-        with open(csv_path, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for i, row in enumerate(reader, 1):
-                self.import_job(row)
-                if i % 100 == 0:
+        # Read and import CSV in bounded chunks; columns stay strings (as with
+        # DictReader) except is_remote, which is coerced once per chunk
+        chunks = pd.read_csv(
+            csv_path, chunksize=self.CSV_CHUNK_SIZE, dtype=str,
+            keep_default_na=False, encoding="utf-8",
+            usecols=lambda col: col in self.CSV_COLUMNS
+        )
+        # The whole import is one transaction: the migration is re-runnable,
+        # so skip the per-commit WAL flush and roll back on failure instead
+        try:
+            self.cursor.execute("SET LOCAL synchronous_commit = OFF")
+            i = 0
+            for chunk in chunks:
+                if "is_remote" in chunk:
+                    chunk["is_remote"] = chunk["is_remote"].str.lower().eq("true")
+                # Parse each list column once; the lookup pre-pass and the job
+                # import both read the parsed values
+                for col in chunk.columns:
+                    if col == "locations" or col.startswith("skills_"):
+                        chunk[col] = chunk[col].map(self.parse_skills_json)
+                rows = chunk.to_dict("records")
+                self.bulk_create_lookups(rows)
+                for start in range(0, len(rows), self.JOB_BATCH_SIZE):
+                    batch = rows[start:start + self.JOB_BATCH_SIZE]
+                    self.import_jobs(batch)
+                    i += len(batch)
                     print(f"  Processed {i} rows...")
-                    self.conn.commit()
 
-        self.conn.commit()
-
-        # Mark jobs not seen in this run as closed
-        self.mark_closed_jobs()
-
-        self.conn.close()
+            # Mark jobs not seen in this run as closed
+            self.mark_closed_jobs()
+            refresh_skill_counts(self.cursor)
+            refresh_dashboard_stats(self.cursor)
+            # Refresh planner statistics after the bulk import
+            self.cursor.execute("ANALYZE jobs, job_locations, job_skills, companies, locations, skills")
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            self.conn.close()
 
         # Print statistics
         print("\n" + "="*50)
@@ -7,47 +7,103 @@ from pathlib import Path
 DB_PATH = Path(__file__).resolve().parent.parent / "data" / "market_analyzer.db"
 
 
-def get_table_info(conn: sqlite3.Connection, table: str) -> list[dict]:
-    """Get column info for a table."""
-    cursor = conn.execute(f"PRAGMA table_info({table})")
-    return [
-        {
-            "name": row[1],
-            "type": row[2],
-            "notnull": bool(row[3]),
-            "default": row[4],
-            "pk": bool(row[5]),
-        }
-        for row in cursor.fetchall()
-    ]
-
-
-def get_foreign_keys(conn: sqlite3.Connection, table: str) -> list[dict]:
-    """Get foreign key info for a table."""
-    cursor = conn.execute(f"PRAGMA foreign_key_list({table})")
-    return [
-        {"from": row[3], "to_table": row[2], "to_col": row[4]}
-        for row in cursor.fetchall()
-    ]
-
-
-def get_indexes(conn: sqlite3.Connection, table: str) -> list[dict]:
-    """Get index info for a table."""
-    cursor = conn.execute(f"PRAGMA index_list({table})")
-    indexes = []
-    for row in cursor.fetchall():
-        idx_name = row[1]
-        unique = bool(row[2])
-        cols_cursor = conn.execute(f"PRAGMA index_info({idx_name})")
-        cols = [c[2] for c in cols_cursor.fetchall()]
-        indexes.append({"name": idx_name, "unique": unique, "columns": cols})
+def _open(db_path: Path) -> sqlite3.Connection:
+    """Open the database read-only with a large page cache and memory-mapped I/O"""
+    conn = sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True)
+    conn.executescript(
+        "PRAGMA query_only = ON;"
+        "PRAGMA mmap_size = 268435456;"
+        "PRAGMA cache_size = -65536;"
+        "PRAGMA temp_store = MEMORY;"
+        "PRAGMA trusted_schema = OFF;"
+    )
+    return conn
+
+
+# Table-valued PRAGMA functions joined against sqlite_master read the whole
+# schema in one query each instead of one PRAGMA call per table and index
+_TABLES = "FROM sqlite_master m JOIN {} WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%'"
+
+
+def get_table_info(conn: sqlite3.Connection) -> dict[str, list[dict]]:
+    """Get column info for every table."""
+    columns = {}
+    for table, name, col_type, notnull, default, pk in conn.execute(
+        "SELECT m.name, p.name, p.type, p.\"notnull\", p.dflt_value, p.pk "
+        + _TABLES.format("pragma_table_info(m.name) p") + " ORDER BY m.name, p.cid"
+    ):
+        columns.setdefault(table, []).append({
+            "name": name,
+            "type": col_type,
+            "notnull": bool(notnull),
+            "default": default,
+            "pk": bool(pk),
+        })
+    return columns
+
+
+def get_foreign_keys(conn: sqlite3.Connection) -> dict[str, list[dict]]:
+    """Get foreign key info for every table."""
+    fks = {}
+    for table, from_col, to_table, to_col in conn.execute(
+        "SELECT m.name, f.\"from\", f.\"table\", f.\"to\" "
+        + _TABLES.format("pragma_foreign_key_list(m.name) f") + " ORDER BY m.name, f.id, f.seq"
+    ):
+        fks.setdefault(table, []).append({"from": from_col, "to_table": to_table, "to_col": to_col})
+    return fks
+
+
+def get_indexes(conn: sqlite3.Connection) -> dict[str, list[dict]]:
+    """Get index info for every table."""
+    indexes = {}
+    for table, idx_name, unique, col in conn.execute(
+        "SELECT m.name, il.name, il.\"unique\", ii.name "
+        + _TABLES.format("pragma_index_list(m.name) il JOIN pragma_index_info(il.name) ii")
+        + " ORDER BY m.name, il.seq, ii.seqno"
+    ):
+        table_indexes = indexes.setdefault(table, [])
+        if not table_indexes or table_indexes[-1]["name"] != idx_name:
+            table_indexes.append({"name": idx_name, "unique": bool(unique), "columns": []})
+        table_indexes[-1]["columns"].append(col)
     return indexes
 
 
-def get_row_count(conn: sqlite3.Connection, table: str) -> int:
-    """Get row count for a table."""
-    cursor = conn.execute(f"SELECT COUNT(*) FROM {table}")
-    return cursor.fetchone()[0]
+def _quote(name: str) -> str:
+    """Quote an SQL identifier (placeholders can't bind table names)."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def get_exact_counts(conn: sqlite3.Connection, tables: list[str]) -> dict[str, int]:
+    """Exact row count per table, in one UNION ALL query."""
+    if not tables:
+        return {}
+    sql = " UNION ALL ".join(
+        f"SELECT ?, COUNT(*) FROM {_quote(table)}" for table in tables
+    )
+    return dict(conn.execute(sql, tables).fetchall())
+
+
+def get_row_counts(conn: sqlite3.Connection, tables: list[str]) -> dict[str, str]:
+    """Formatted row count per table.
+
+    Uses the row estimate ANALYZE stored in sqlite_stat1 (shown with a ~)
+    when available, so large tables aren't scanned; tables without
+    statistics fall back to an exact COUNT(*).
+    """
+    try:
+        # Each stat string starts with the number of rows in the table
+        # (or in the index, for partial indexes, hence MAX)
+        estimates = dict(conn.execute(
+            "SELECT tbl, MAX(CAST(stat AS INTEGER)) FROM sqlite_stat1 GROUP BY tbl"
+        ).fetchall())
+    except sqlite3.OperationalError:
+        estimates = {}  # never analyzed
+
+    exact = get_exact_counts(conn, [t for t in tables if t not in estimates])
+    return {
+        table: f"~{estimates[table]:,}" if table in estimates else f"{exact[table]:,}"
+        for table in tables
+    }
 
 
 def format_column(col: dict, fks: list[dict]) -> str:
@@ -69,17 +125,14 @@ def format_column(col: dict, fks: list[dict]) -> str:
     return f"{prefix}{col['name']:.<30s} {col_type}{not_null}{default}{tag}"
 
 
-def print_table(conn: sqlite3.Connection, table: str):
+def print_table(table: str, row_count: str, columns: list[dict], fks: list[dict],
+                indexes: list[dict]):
     """Print a formatted table diagram."""
-    columns = get_table_info(conn, table)
-    fks = get_foreign_keys(conn, table)
-    indexes = get_indexes(conn, table)
-    row_count = get_row_count(conn, table)
 
     width = 72
     print(f"\n  ╔{'═' * width}╗")
     print(f"  ║ {table.upper():<{width - 2}s} ║")
-    print(f"  ║ {f'{row_count:,} rows':<{width - 2}s} ║")
+    print(f"  ║ {f'{row_count} rows':<{width - 2}s} ║")
     print(f"  ╠{'═' * width}╣")
 
     for col in columns:
@@ -167,7 +220,7 @@ def main():
         print(f"Database not found at {DB_PATH}")
         return
 
-    conn = sqlite3.connect(str(DB_PATH))
+    conn = _open(DB_PATH)
 
     # Get all tables
     cursor = conn.execute(
@@ -185,13 +238,17 @@ def main():
     # Print summary
     print("\n  TABLE SUMMARY")
     print("  " + "-" * 40)
+    row_counts = get_row_counts(conn, tables)
     for table in tables:
-        count = get_row_count(conn, table)
-        print(f"    {table:<25s} {count:>8,} rows")
+        print(f"    {table:<25s} {row_counts[table]:>9s} rows")
 
     # Print each table
+    columns = get_table_info(conn)
+    fks = get_foreign_keys(conn)
+    indexes = get_indexes(conn)
     for table in tables:
-        print_table(conn, table)
+        print_table(table, row_counts[table], columns.get(table, []),
+                    fks.get(table, []), indexes.get(table, []))
 
     # Print relationships
     print_relationships(conn, tables)
@@ -4,15 +4,15 @@
 
 import nltk
 import json
-import ast
 import pandas as pd
 import re
 import unicodedata
 import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
 from nltk.tokenize import RegexpTokenizer
-from nltk.util import ngrams
 
 from .db_config import get_db
 
@@ -24,6 +24,27 @@ try:
 except LookupError:
     nltk.download('punkt')
 
+# URLs, emails, and any character outside the whitelist (alphanumeric, spaces,
+# and + # . , - $ :) are stripped in a single pass
+_NOISE_PATTERN = re.compile(
+    r'https?://\S+|www\.\S+|\S+@\S+|[^a-zA-Z0-9 \+\#\.\,\-\$\:]'
+)
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+# "$90,000 - $120,000", "$80k to $100k", "$75,000", ...
+_SALARY_PATTERN = re.compile(
+    r'(\$[0-9][0-9,\.]*[kK]?\s*(?:-|to)?\s*\$?[0-9][0-9,\.]*[kK]?)'
+)
+# Visible text nodes only: skips script/style/header/footer content and comments
+_VISIBLE_TEXT = etree.XPath(
+    '//text()[not(ancestor::script or ancestor::style'
+    ' or ancestor::header or ancestor::footer)]'
+)
+_SKILL_TOKENIZER = RegexpTokenizer(r'[a-zA-Z0-9]+(?:\+\+|#|\.[a-z]+)?')
+# Below this many rows, process start-up costs more than the parallel work saves
+PARALLEL_MIN_ROWS = 1000
+# Listings flattened per json_normalize call while loading
+LOAD_CHUNK_SIZE = 5000
+
 def load_skills(db_url=None):
     """
     Loads skill taxonomy from the database and returns {category: set(skills)}.
@@ -57,9 +78,18 @@ def load_job_data(filename):
     try:
         with open(filepath, 'r') as f:
             data = json.load(f)
-
-        # Normalize nested JSON into a flat table
-        df = pd.json_normalize(data)
+        if isinstance(data, dict):
+            data = [data]
+
+        # Normalize nested JSON into a flat table a chunk at a time, taken off
+        # the end of the list so each chunk's dicts are freed once flattened
+        # instead of the whole object graph living alongside the DataFrame
+        frames = []
+        while data:
+            frames.append(pd.json_normalize(data[-LOAD_CHUNK_SIZE:]))
+            del data[-LOAD_CHUNK_SIZE:]
+        frames.reverse()
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
         print(f"Successfully loaded {len(df)} job listings from {filepath}.")
         return df
 
@@ -77,27 +107,24 @@ def clean_job_text(text):
     if not isinstance(text, str):
         return ""
 
-    # 1. HTML Parsing
-    soup = BeautifulSoup(text, "lxml")
-    for element in soup(['script', 'style', 'header', 'footer']):
-        element.decompose()
-    
-    text = soup.get_text(separator=" ")
+    # 1. HTML Parsing (skipped for plain text with no tags or entities)
+    if "<" in text or "&" in text:
+        try:
+            text = " ".join(_VISIBLE_TEXT(lxml.html.document_fromstring(text)))
+        except (etree.ParserError, ValueError):
+            # Empty documents or inputs lxml rejects; the regex pass below still
+            # strips any leftover markup characters
+            pass
 
     # 2. Unicode Normalization
     text = unicodedata.normalize("NFKD", text)
     
     # 3. Regex Cleaning
-    # Remove URLs
-    text = re.sub(r'https?://\S+|www\.\S+', '', text)
-    # Remove Emails
-    text = re.sub(r'\S+@\S+', '', text)
-
-    # Whitelist Filter: Keep ONLY alphanumeric, spaces, and specific punctuation
-    text = re.sub(r'[^a-zA-Z0-9 \+\#\.\,\-\$\:]', ' ', text)
+    # Remove URLs, emails, and non-whitelisted characters in one pass
+    text = _NOISE_PATTERN.sub(' ', text)
 
     # Collapse multiple spaces
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = _WHITESPACE_PATTERN.sub(' ', text).strip()
     
     return text
 
@@ -140,15 +167,26 @@ def extract_salary(text):
     """
     Attempts to pull salary ranges using Regex.
     """
-    pattern = r'(\$[0-9][0-9,\.]*[kK]?\s*(?:-|to)?\s*\$?[0-9][0-9,\.]*[kK]?)'
-    match = re.search(pattern, text)
+    match = _SALARY_PATTERN.search(text)
     if match:
         return match.group(0)
     return None
 
-def extract_skills_from_text(text, taxonomy):
+def build_skill_index(taxonomy):
+    """
+    Inverts {category: set(skills)} into {skill: (categories,)} so callers that
+    extract from many documents can match each token with one dict lookup.
+    """
+    index = {}
+    for category, keywords in taxonomy.items():
+        for keyword in keywords:
+            index[keyword] = index.get(keyword, ()) + (category,)
+    return index
+
+def extract_skills_from_text(text, taxonomy, skill_index=None):
     """
     Tokenizes text and finds matches against the skill taxonomy.
+    Pass a prebuilt build_skill_index(taxonomy) when processing many documents.
     """
     if not taxonomy:
         return {}
@@ -156,68 +194,98 @@ def extract_skills_from_text(text, taxonomy):
     text = text.lower()
 
     # Regex Tokenizer for tech terms
-    tokenizer = RegexpTokenizer(r'[a-zA-Z0-9]+(?:\+\+|#|\.[a-z]+)?')
-    tokens = tokenizer.tokenize(text)
+    tokens = _SKILL_TOKENIZER.tokenize(text)
+
+    # Unigrams plus bigrams, deduplicated up front
+    all_tokens = set(tokens)
+    all_tokens.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+
+    if skill_index is None:
+        return {
+            category: list(all_tokens.intersection(keywords))
+            for category, keywords in taxonomy.items()
+        }
 
-    # Generate Bigrams
-    bigrams = [" ".join(bg) for bg in ngrams(tokens, 2)]
-    all_tokens = tokens + bigrams
-    
     found_skills = {category: [] for category in taxonomy}
-    
     for token in all_tokens:
-        for category, keywords in taxonomy.items():
-            if token in keywords:
-                found_skills[category].append(token)
-
-    for cat in found_skills:
-        found_skills[cat] = list(set(found_skills[cat]))
-        
+        for category in skill_index.get(token, ()):
+            found_skills[category].append(token)
     return found_skills
 
+# Per-process taxonomy for _process_row, set once by the pool initializer
+_worker_taxonomy = None
+_worker_skill_index = None
+
+def _init_worker(taxonomy, skill_index):
+    global _worker_taxonomy, _worker_skill_index
+    _worker_taxonomy = taxonomy
+    _worker_skill_index = skill_index
+
+def _process_row(contents):
+    """
+    Cleans one description, then pulls its salary and skills from the same
+    cleaned string; runs in pool workers.
+    """
+    cleaned = clean_job_text(contents)
+    return (cleaned, extract_salary(cleaned),
+            extract_skills_from_text(cleaned, _worker_taxonomy, _worker_skill_index))
+
+def _with_json_cells(df):
+    """Copy of df with list/dict cells serialized as JSON strings."""
+    to_json = lambda v: json.dumps(v) if isinstance(v, (list, dict)) else v
+    return df.assign(**{
+        col: df[col].map(to_json) for col in df.columns if df[col].dtype == object
+    })
+
+
 def process_dataset(data_file, db_url=None):
     """
     Main driver function.
     """
     # 1. Load Data using our new functions
     taxonomy = load_skills(db_url)
+    skill_index = build_skill_index(taxonomy)
     df = load_job_data(data_file)
 
     if df.empty:
         return df
 
-    # 2. Clean Text
-    df['clean_description'] = f['contents'].apply(clean_job_text)
-
-    # 3. Extract Salary
-    df['salary'] = df['clean_description'].apply(extract_salary)
+    # 2. Clean Text, Extract Salary and Skills in one pass per row; this work
+    # is CPU-bound, so large datasets are spread over a process pool
+    if len(df) >= PARALLEL_MIN_ROWS and (os.cpu_count() or 1) > 1:
+        with ProcessPoolExecutor(initializer=_init_worker,
+                                 initargs=(taxonomy, skill_index)) as pool:
+            results = list(pool.map(_process_row, df['contents'], chunksize=256))
+    else:
+        _init_worker(taxonomy, skill_index)
+        results = [_process_row(contents) for contents in df['contents']]
+    df['clean_description'], df['salary'], df['skills_data'] = zip(*results)
 
-    # 4. Extract Skills
-    df['skills_data'] = df['clean_description'].apply(
-        lambda x: extract_skills_from_text(x, taxonomy)
-    )
-    # 5. Extract Location
+    # 3. Extract Location
 
     # Apply function to get tuples: ("New York", True)
     if 'locations' in df.columns:
         location_data = df['locations'].apply(extract_location_info)
 
-        # Split the tuple into two columns
-        df['job_city'] = location_data.apply(lambda x: x[0])
-        df['is_remote'] = location_data.apply(lambda x: x[1])
+        # Split the tuple into two columns; is_remote is stored as a real bool
+        df['job_city'] = location_data.str[0]
+        df['is_remote'] = location_data.str[1].astype(bool)
     else:
         df['job_city'] = "Unknown"
         df['is_remote'] = False
 
-    # 6. Expand Skills into Columns
-    skills_df = pd.json_normalize(df['skills_data'])
-    skills_df.columns = [f"skills_{c}" for c in skills_df.columns]
-
-    df = pd.concat([df, skills_df], axis=1)
+    # 4. Expand Skills into Columns; every skills dict holds one list per
+    # taxonomy category, so each column is read straight out of the dicts
+    df = df.assign(**{
+        f"skills_{category}": [skills[category] for skills in df['skills_data']]
+        for category in taxonomy
+    })
 
-    # 7. Save to CSV
+    # 5. Save to CSV; list/dict cells are written as JSON rather than Python
+    # reprs so the migrator can read them with json.loads. skills_data is
+    # left out since the skills_* columns already hold the same lists
     output_path = ROOT_DIR / "data" / "processed_jobs.csv"
-    df.to_csv(output_path, index=False)
+    _with_json_cells(df.drop(columns='skills_data')).to_csv(output_path, index=False)
     print(f"✓ Saved {len(df)} processed jobs to {output_path}")
 
     return df
@@ -234,5 +302,3 @@ if __name__ == "__main__":
         cols_to_show = ['job_city', 'is_remote']
         existing_cols = [c for c in cols_to_show if c in final_df.columns]
         print(final_df[existing_cols].head())
-        output_path = ROOT_DIR / "data" / "processed_jobs.csv"
-        final_df.to_csv(output_path, index=False)
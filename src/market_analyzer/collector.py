@@ -5,20 +5,97 @@ import requests
 import json
 import os
 import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
 
 import psycopg2
+from psycopg2.extras import execute_values
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
 from serpapi import GoogleSearch
+from urllib3.util.retry import Retry
 
-from market_analyzer.cleaner import clean_job_text, load_skills, extract_skills_from_text
+from market_analyzer.cleaner import clean_job_text, build_skill_index, extract_skills_from_text
 from market_analyzer.db_config import DATABASE_URL
+from market_analyzer.db_queries import refresh_dashboard_stats
+from market_analyzer.db_writes import JobBatch, LookupCache, location_key, upsert_jobs
+from market_analyzer.skill_recommender import refresh_skill_counts
 
 ROOT_DIR = Path(__file__).resolve().parent.parent.parent
 
 MUSE_URL = "https://www.themuse.com/api/public/jobs"
+# (connect, read) seconds for each Muse page request
+MUSE_TIMEOUT = (5, 30)
+# States fetched concurrently by collect_all_states
+MUSE_WORKERS = 8
+# Spacing between Muse request starts, shared by all threads, adapts to the
+# server: none while it keeps up, doubling from MUSE_BACKOFF_MIN up to
+# MUSE_BACKOFF_MAX seconds whenever it answers 429/503, halving after each
+# response that came back without being throttled
+MUSE_BACKOFF_MIN = 1.0
+MUSE_BACKOFF_MAX = 60.0
+_THROTTLE_STATUSES = frozenset((429, 503))
+
+_muse_local = threading.local()
+_muse_slot_lock = threading.Lock()
+_muse_next_slot = 0.0
+_muse_interval = 0.0
+
+
+def _muse_session():
+    """
+    Per-thread pooled session: keeps the connection to The Muse alive across
+    pages and retries rate-limit / server errors with backoff. The last failed
+    response is returned (not raised) so get_muse_jobs reports it as before.
+    """
+    session = getattr(_muse_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=4,
+            max_retries=Retry(
+                total=5,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=("GET",),
+                raise_on_status=False,
+            ),
+        ))
+        _muse_local.session = session
+    return session
+
+
+def _wait_for_muse_slot():
+    """Block until this thread may start its next Muse request."""
+    global _muse_next_slot
+    with _muse_slot_lock:
+        now = time.monotonic()
+        slot = max(now, _muse_next_slot)
+        _muse_next_slot = slot + _muse_interval
+    if slot > now:
+        time.sleep(slot - now)
+
+
+def _adapt_muse_pacing(response):
+    """Widen or narrow the request spacing based on whether The Muse pushed back."""
+    global _muse_interval
+    # Throttled attempts urllib3 already retried (honoring Retry-After) are
+    # recorded in the retry history of the final response
+    retries = getattr(response.raw, "retries", None)
+    history = retries.history if retries is not None else ()
+    throttled = response.status_code in _THROTTLE_STATUSES or any(
+        attempt.status in _THROTTLE_STATUSES for attempt in history
+    )
+    with _muse_slot_lock:
+        if throttled:
+            _muse_interval = min(max(_muse_interval * 2, MUSE_BACKOFF_MIN), MUSE_BACKOFF_MAX)
+        elif _muse_interval:
+            _muse_interval = _muse_interval / 2 if _muse_interval > MUSE_BACKOFF_MIN else 0.0
 
 # Most populous city in each US state
 TOP_CITIES_BY_STATE = {
@@ -87,7 +164,9 @@ def get_muse_jobs(category="Software Engineering", location="New York, NY", page
                 "category": category,
                 "location": location,
                 }
-        response = requests.get(MUSE_URL, params=params)
+        _wait_for_muse_slot()
+        response = _muse_session().get(MUSE_URL, params=params, timeout=MUSE_TIMEOUT)
+        _adapt_muse_pacing(response)
 
         if response.status_code != 200:
             print(f"Error: {response.status_code}")
@@ -100,32 +179,35 @@ def get_muse_jobs(category="Software Engineering", location="New York, NY", page
             break
 
         all_jobs.extend(results)
-
-        time.sleep(1)
     return all_jobs
 
 
 def collect_all_states(category="Software Engineering", page_limit=3):
     """Fetch Software Engineering jobs from the most populous city in each US state."""
     all_jobs = []
-    state_count = 0
+    cities = list(TOP_CITIES_BY_STATE.values())
 
-    print(f"\n🌍 Collecting jobs from all {len(TOP_CITIES_BY_STATE)} US states...")
+    print(f"\n🌍 Collecting jobs from all {len(cities)} US states...")
     print("=" * 60)
 
-    for state_name, city in TOP_CITIES_BY_STATE.items():
-        state_count += 1
-        print(f"\n[{state_count}/{len(TOP_CITIES_BY_STATE)}] Fetching from {city}...")
-
+    def fetch(city):
         try:
-            jobs = get_muse_jobs(category=category, location=city, page_limit=page_limit)
-            all_jobs.extend(jobs)
-            print(f"  ✓ Found {len(jobs)} jobs from {city}")
+            return get_muse_jobs(category=category, location=city, page_limit=page_limit), None
         except Exception as e:
-            print(f"  ✗ Error fetching from {city}: {e}")
-
-        # Rate limiting between states
-        time.sleep(2)
+            return [], e
+
+    # States are fetched on a thread pool; request starts share the adaptive
+    # pacing in _wait_for_muse_slot, so a throttled server slows every thread
+    with ThreadPoolExecutor(max_workers=MUSE_WORKERS) as pool:
+        for state_count, (city, (jobs, error)) in enumerate(
+            zip(cities, pool.map(fetch, cities)), start=1
+        ):
+            print(f"\n[{state_count}/{len(cities)}] {city}")
+            if error is None:
+                all_jobs.extend(jobs)
+                print(f"  ✓ Found {len(jobs)} jobs from {city}")
+            else:
+                print(f"  ✗ Error fetching from {city}: {error}")
 
     print("\n" + "=" * 60)
     print(f"✓ Collection complete: {len(all_jobs)} total jobs collected from all states")
@@ -134,8 +216,10 @@ def collect_all_states(category="Software Engineering", page_limit=3):
 # Saves collected job data to a JSON file in the data directory
 def save_to_file(data, filename="muse_jobs.json"):
     filepath = ROOT_DIR / "data" / filename
+    # json.dumps without indent runs in the C encoder in one shot;
+    # json.dump(indent=...) streams through the pure-Python encoder
     with open(filepath, "w") as f:
-        json.dump(data, f, indent=4)
+        f.write(json.dumps(data))
         print(f"Successfully saved {len(data)} jobs to {filepath}")
 
 def get_google_jobs(query="software developer", location="Austin, Texas, United States", num_pages=1):
@@ -186,28 +270,33 @@ def get_google_jobs(query="software developer", location="Austin, Texas, United
     return all_jobs
 
 
+# Length of one unit in SerpAPI "<n> <unit>[s] ago" posted_at strings
+_RELATIVE_DATE_UNITS = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+    "month": timedelta(days=30),
+}
+# Patterns for the SerpAPI salary strings, compiled once
+_HOURLY_SALARY = re.compile(r'(\ban?\s+hour\b|/hr|/h\b|hourly)')
+_YEARLY_SALARY = re.compile(r'(\byear\b|/yr|annually|annual)')
+_DOLLAR_AMOUNT = re.compile(r"\$[\d,\.]+k?")
+
+
 def _parse_relative_date(posted_at):
     """Convert relative date string like '3 days ago' to ISO timestamp."""
     if not posted_at:
         return None
 
-    now = datetime.now()
-    posted_at = posted_at.lower().strip()
-
-    match = re.match(r"(\d+)\s+(hour|day|week|month)s?\s+ago", posted_at)
-    if match:
-        amount = int(match.group(1))
-        unit = match.group(2)
-        if unit == "hour":
-            return (now - timedelta(hours=amount)).isoformat()
-        elif unit == "day":
-            return (now - timedelta(days=amount)).isoformat()
-        elif unit == "week":
-            return (now - timedelta(weeks=amount)).isoformat()
-        elif unit == "month":
-            return (now - timedelta(days=amount * 30)).isoformat()
-
-    return None
+    # The grammar is just "<n> <unit>[s] ago", so a split beats a regex
+    parts = posted_at.lower().split(maxsplit=3)
+    if len(parts) < 3 or not parts[0].isdecimal() or not parts[2].startswith("ago"):
+        return None
+    unit = parts[1][:-1] if parts[1].endswith("s") else parts[1]
+    delta = _RELATIVE_DATE_UNITS.get(unit)
+    if delta is None:
+        return None
+    return (datetime.now() - delta * int(parts[0])).isoformat()
 
 
 def _parse_google_salary(salary_str):
@@ -224,16 +313,16 @@ def _parse_google_salary(salary_str):
 
     salary_str = salary_str.lower().strip()
     # Only trigger hourly if it clearly says "an hour", "/hr", etc.
-    is_hourly = bool(re.search(r'(\ban?\s+hour\b|/hr|/h\b|hourly)', salary_str))
+    is_hourly = bool(_HOURLY_SALARY.search(salary_str))
     
     # Check if it explicitly says "year" to prevent double-counting
-    is_yearly = bool(re.search(r'(\byear\b|/yr|annually|annual)', salary_str))
+    is_yearly = bool(_YEARLY_SALARY.search(salary_str))
     
     # If it has both, or just "year", do NOT multiply
     should_multiply = is_hourly and not is_yearly
 
     # Find all dollar amounts
-    amounts = re.findall(r"\$[\d,\.]+k?", salary_str)
+    amounts = _DOLLAR_AMOUNT.findall(salary_str)
     if not amounts:
         return None, None
 
@@ -272,25 +361,56 @@ def _parse_google_location(location_str):
     return city, state
 
 
+# Relations _JobDBWriter writes to or refreshes; if all exist, schema.sql has
+# already been applied (later changes ship as migrations/)
+_SCHEMA_RELATIONS = (
+    "companies", "locations", "skill_categories", "skills", "jobs",
+    "job_locations", "job_skills", "skill_job_counts", "skill_pair_counts",
+    "dashboard_stats",
+)
+# schema.sql text, read on first use
+_SCHEMA_SQL = None
+
+
 class _JobDBWriter:
     """Shared DB logic for upserting jobs from any source into PostgreSQL."""
 
+    # Jobs per multi-row UPSERT; larger pages stop paying off in PostgreSQL
+    JOB_BATCH_SIZE = 1000
+    # Distinct descriptions whose cleaned text and skills are kept for reposts
+    DESCRIPTION_CACHE_SIZE = 50_000
+
     def __init__(self, db_url=None):
         if db_url is None:
             db_url = DATABASE_URL
         self.conn = psycopg2.connect(db_url)
         self.cursor = self.conn.cursor()
-
-        schema_path = ROOT_DIR / "data" / "schema.sql"
-        with open(schema_path, "r") as f:
-            self.cursor.execute(f.read())
-        self.conn.commit()
-
-        self.taxonomy = load_skills(db_url)
-        self._company_cache = {}
-        self._location_cache = {}
-        self._skill_category_cache = {}
-        self._skill_cache = {}
+        # Imports are re-runnable from the source listings, so this session's
+        # commits skip waiting on the WAL flush; the larger work_mem keeps the
+        # link merges' DISTINCT sorts in memory. Session-level, because a
+        # shared writer commits once per batch of states.
+        self.cursor.execute("SET synchronous_commit = OFF")
+        self.cursor.execute("SET work_mem = '64MB'")
+
+        self._ensure_schema()
+
+        # Seeded from existing rows so only new values hit the DB
+        self.lookups = LookupCache()
+        self.lookups.load(self.cursor)
+        self._company_cache = self.lookups.companies
+        self._location_cache = self.lookups.locations
+        self._skill_cache = self.lookups.skills
+
+        # The preloaded skill rows are the same join load_skills() runs, so the
+        # taxonomy comes from them instead of a second connection and query
+        self.taxonomy = {}
+        for skill_name, category in self._skill_cache:
+            self.taxonomy.setdefault(category, set()).add(skill_name)
+        self.skill_index = build_skill_index(self.taxonomy)
+        # Per writer, since the extracted skills depend on its taxonomy
+        self.analyze_description = lru_cache(maxsize=self.DESCRIPTION_CACHE_SIZE)(
+            self._analyze_description
+        )
         self.run_timestamp = datetime.now().isoformat()
         self.stats = {
             "jobs_imported": 0,
@@ -300,131 +420,147 @@ class _JobDBWriter:
             "skill_links_created": 0,
             "errors": 0,
         }
+        # Prepared (job values, location ids, skill ids) awaiting flush()
+        self._batch = JobBatch(self.cursor, self.stats, self.JOB_BATCH_SIZE)
+
+    def _ensure_schema(self):
+        """Run schema.sql only when a relation the writer relies on is missing."""
+        global _SCHEMA_SQL
+        self.cursor.execute(
+            "SELECT bool_and(to_regclass(name) IS NOT NULL) FROM unnest(%s::text[]) AS name",
+            (list(_SCHEMA_RELATIONS),),
+        )
+        if self.cursor.fetchone()[0]:
+            return
+        if _SCHEMA_SQL is None:
+            with open(ROOT_DIR / "data" / "schema.sql", "r") as f:
+                _SCHEMA_SQL = f.read()
+        self.cursor.execute(_SCHEMA_SQL)
+        self.conn.commit()
+
+    def _analyze_description(self, description):
+        """Return (cleaned text, skills found) for a raw job description."""
+        cleaned = clean_job_text(description)
+        return cleaned, extract_skills_from_text(cleaned, self.taxonomy, self.skill_index)
+
+    def _count_created(self, created):
+        self.stats["companies_created"] += created["companies"]
+        self.stats["locations_created"] += created["locations"]
 
     def get_or_create_company(self, name):
         if not name:
             return None
-        if name in self._company_cache:
-            return self._company_cache[name]
-        self.cursor.execute("SELECT id FROM companies WHERE name = %s", (name,))
-        row = self.cursor.fetchone()
-        if row:
-            self._company_cache[name] = row[0]
-            return row[0]
-        self.cursor.execute("INSERT INTO companies (name) VALUES (%s) RETURNING id", (name,))
-        cid = self.cursor.fetchone()[0]
-        self._company_cache[name] = cid
-        self.stats["companies_created"] += 1
-        return cid
+        if name not in self._company_cache:
+            self._count_created(self.lookups.create_missing(self.cursor, companies=[(name, None)]))
+        return self._company_cache[name]
 
     def get_or_create_location(self, city, state):
-        key = (city, state, "USA")
-        if key in self._location_cache:
-            return self._location_cache[key]
-        self.cursor.execute(
-            "SELECT id FROM locations WHERE city = %s AND state = %s AND country = %s", key,
-        )
-        row = self.cursor.fetchone()
-        if row:
-            self._location_cache[key] = row[0]
-            return row[0]
-        self.cursor.execute(
-            "INSERT INTO locations (city, state, country) VALUES (%s, %s, %s) RETURNING id", key,
-        )
-        lid = self.cursor.fetchone()[0]
-        self._location_cache[key] = lid
-        self.stats["locations_created"] += 1
-        return lid
+        key = location_key(city, state)
+        if key not in self._location_cache:
+            self._count_created(self.lookups.create_missing(self.cursor, location_keys=[key]))
+        return self._location_cache[key]
 
     def get_or_create_skill(self, skill_name, category_name):
         key = (skill_name, category_name)
-        if key in self._skill_cache:
-            return self._skill_cache[key]
-        # Category
-        if category_name not in self._skill_category_cache:
-            self.cursor.execute("SELECT id FROM skill_categories WHERE name = %s", (category_name,))
-            row = self.cursor.fetchone()
-            if row:
-                self._skill_category_cache[category_name] = row[0]
-            else:
-                self.cursor.execute(
-                    "INSERT INTO skill_categories (name) VALUES (%s) RETURNING id", (category_name,),
-                )
-                self._skill_category_cache[category_name] = self.cursor.fetchone()[0]
-        cat_id = self._skill_category_cache[category_name]
-        # Skill
-        self.cursor.execute(
-            "SELECT id FROM skills WHERE name = %s AND category_id = %s", (skill_name, cat_id),
-        )
-        row = self.cursor.fetchone()
-        if row:
-            self._skill_cache[key] = row[0]
-            return row[0]
-        self.cursor.execute(
-            "INSERT INTO skills (name, category_id) VALUES (%s, %s) RETURNING id",
-            (skill_name, cat_id),
+        if key not in self._skill_cache:
+            self.lookups.create_missing(self.cursor, skill_keys=[key])
+        return self._skill_cache[key]
+
+    def _link_rows(self, table, column, rows):
+        """Insert (job_id, <column>) pairs into a junction table, skipping existing links."""
+        execute_values(
+            self.cursor,
+            f"INSERT INTO {table} (job_id, {column}) VALUES %s ON CONFLICT DO NOTHING",
+            rows, page_size=self.JOB_BATCH_SIZE,
         )
-        sid = self.cursor.fetchone()[0]
-        self._skill_cache[key] = sid
-        return sid
+
+    def job_values(self, external_id, title, company_id, cleaned_desc,
+                   salary_min, salary_max, is_remote, pub_date, job_url):
+        """Row tuple for the jobs UPSERT, stamped with this run's timestamp."""
+        return (external_id, title, company_id, cleaned_desc, salary_min, salary_max,
+                is_remote, pub_date, job_url, self.run_timestamp, self.run_timestamp)
 
     def upsert_job(self, external_id, title, company_id, cleaned_desc,
                    salary_min, salary_max, is_remote, pub_date, job_url):
         """Upsert a job row. Returns the job ID."""
-        self.cursor.execute("SELECT id FROM jobs WHERE external_job_id = %s", (external_id,))
-        existing = self.cursor.fetchone()
-
-        if existing:
-            job_id = existing[0]
-            self.cursor.execute(
-                """UPDATE jobs SET
-                    title = %s, company_id = %s, description = %s,
-                    salary_min = %s, salary_max = %s, is_remote = %s,
-                    publication_date = %s, fetched_at = %s, updated_at = %s,
-                    status = 'open', last_seen_at = %s, job_url = %s
-                WHERE id = %s""",
-                (title, company_id, cleaned_desc, salary_min, salary_max,
-                 is_remote, pub_date, self.run_timestamp, self.run_timestamp,
-                 self.run_timestamp, job_url, job_id),
-            )
-            self.stats["jobs_updated"] += 1
-        else:
-            self.cursor.execute(
-                """INSERT INTO jobs (
-                    external_job_id, title, company_id, description,
-                    salary_min, salary_max, is_remote, publication_date,
-                    fetched_at, last_seen_at, status, job_url
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'open', %s)
-                RETURNING id""",
-                (external_id, title, company_id, cleaned_desc, salary_min,
-                 salary_max, is_remote, pub_date, self.run_timestamp,
-                 self.run_timestamp, job_url),
-            )
-            job_id = self.cursor.fetchone()[0]
-            self.stats["jobs_imported"] += 1
-
+        values = self.job_values(external_id, title, company_id, cleaned_desc,
+                                 salary_min, salary_max, is_remote, pub_date, job_url)
+        [(_, job_id, inserted)] = upsert_jobs(self.cursor, [values])
+        self.stats["jobs_imported" if inserted else "jobs_updated"] += 1
         return job_id
 
     def link_location(self, job_id, city, state):
         location_id = self.get_or_create_location(city, state)
-        self.cursor.execute(
-            """INSERT INTO job_locations (job_id, location_id) VALUES (%s, %s)
-               ON CONFLICT DO NOTHING""",
-            (job_id, location_id),
-        )
+        self._link_rows("job_locations", "location_id", [(job_id, location_id)])
+
+    def skill_ids(self, skills_found):
+        """Resolve {category: [skill, ...]} into skill IDs, creating new skills."""
+        return [self.get_or_create_skill(skill_name, category)
+                for category, skill_list in skills_found.items()
+                for skill_name in skill_list]
 
     def link_skills(self, job_id, skills_found):
-        for category, skill_list in skills_found.items():
-            for skill_name in skill_list:
-                skill_id = self.get_or_create_skill(skill_name, category)
-                self.cursor.execute(
-                    """INSERT INTO job_skills (job_id, skill_id) VALUES (%s, %s)
-                       ON CONFLICT DO NOTHING""",
-                    (job_id, skill_id),
-                )
-                self.stats["skill_links_created"] += 1
+        rows = [(job_id, skill_id) for skill_id in self.skill_ids(skills_found)]
+        if rows:
+            self._link_rows("job_skills", "skill_id", rows)
+            self.stats["skill_links_created"] += len(rows)
+
+    def prefetch(self, company_names, location_keys, skill_keys):
+        """
+        Create every company, (city, state) location and (skill, category)
+        not already cached with one multi-row INSERT per table, so the
+        get_or_create_* lookups that follow are all cache hits.
+        """
+        self._count_created(self.lookups.create_missing(
+            self.cursor,
+            companies=((name, None) for name in company_names if name),
+            location_keys=(location_key(city, state) for city, state in location_keys),
+            skill_keys=skill_keys,
+        ))
+
+    def add_parsed_jobs(self, parsed):
+        """
+        Queue jobs parsed by the save_* functions, as (external_id, title,
+        company_name, cleaned_desc, salary_min, salary_max, is_remote,
+        pub_date, job_url, [(city, state), ...], skills_found) tuples.
+        """
+        self.prefetch(
+            (job[2] for job in parsed),
+            (key for job in parsed for key in job[9]),
+            ((skill_name, category) for job in parsed
+             for category, skill_list in job[10].items() for skill_name in skill_list),
+        )
+        for (external_id, title, company_name, cleaned, salary_min, salary_max,
+             is_remote, pub_date, job_url, location_keys, skills_found) in parsed:
+            self.add_job(
+                self.job_values(external_id, title, self.get_or_create_company(company_name),
+                                cleaned, salary_min, salary_max, is_remote, pub_date, job_url),
+                [self.get_or_create_location(city, state) for city, state in location_keys],
+                self.skill_ids(skills_found),
+            )
+
+    def add_job(self, job_values, location_ids, skill_ids):
+        """Queue a job and its links; written in batches of JOB_BATCH_SIZE by flush()."""
+        self._batch.add(job_values, location_ids, skill_ids)
+
+    def flush(self):
+        """Write queued jobs with one multi-row UPSERT plus one COPY merge per junction table."""
+        self._batch.flush()
+
+    def rollback(self):
+        """
+        Abandon the current transaction after a failed write so the writer
+        can be reused: queued jobs are dropped and the ID caches reloaded,
+        since they may hold rows the rollback discarded.
+        """
+        self.conn.rollback()
+        self._batch.discard()
+        self.lookups.reload(self.cursor)
 
     def finish(self, label="Import"):
+        self.flush()
+        refresh_skill_counts(self.cursor)
+        refresh_dashboard_stats(self.cursor)
         self.conn.commit()
         self.conn.close()
         print(f"\n{'=' * 50}")
@@ -440,10 +576,17 @@ class _JobDBWriter:
         return self.stats
 
 
-def save_google_jobs_to_db(jobs, db_url=None):
-    """Clean, extract skills, and upsert Google Jobs into PostgreSQL."""
-    db = _JobDBWriter(db_url)
+def save_google_jobs_to_db(jobs, db_url=None, db=None):
+    """Clean, extract skills, and upsert Google Jobs into PostgreSQL.
+
+    Pass an open ``db`` writer to reuse its connection and caches across
+    calls; the batch is committed and the caller finishes the writer.
+    """
+    owns_db = db is None
+    if owns_db:
+        db = _JobDBWriter(db_url)
 
+    parsed = []
     for job in jobs:
         try:
             ext = job.get("detected_extensions", {})
@@ -453,8 +596,7 @@ def save_google_jobs_to_db(jobs, db_url=None):
             location_str = job.get("location", "")
             description = job.get("description", "")
 
-            company_id = db.get_or_create_company(company_name)
-            if not company_id:
+            if not company_name:
                 db.stats["errors"] += 1
                 continue
 
@@ -468,29 +610,40 @@ def save_google_jobs_to_db(jobs, db_url=None):
             is_remote = "remote" in location_str.lower() or "remote" in (schedule or "").lower()
             pub_date = _parse_relative_date(ext.get("posted_at"))
 
-            cleaned = clean_job_text(description)
-            skills_found = extract_skills_from_text(cleaned, db.taxonomy)
+            cleaned, skills_found = db.analyze_description(description)
 
-            job_id = db.upsert_job(
-                external_id, title, company_id, cleaned,
+            parsed.append((
+                external_id, title, company_name, cleaned,
                 salary_min, salary_max, is_remote, pub_date, job_url,
-            )
-            db.link_location(job_id, city, state)
-            db.link_skills(job_id, skills_found)
+                [(city, state)], skills_found,
+            ))
 
         except Exception as e:
             print(f"Error processing job '{job.get('title', '?')}': {e}")
             db.stats["errors"] += 1
 
-    return db.finish("Google Jobs Import")
+    db.add_parsed_jobs(parsed)
+
+    if owns_db:
+        return db.finish("Google Jobs Import")
+    db.flush()
+    db.conn.commit()
+    return db.stats
+
 
+def save_muse_jobs_to_db(jobs, db_url=None, db=None):
+    """Clean, extract skills, and upsert Muse jobs into PostgreSQL.
 
-def save_muse_jobs_to_db(jobs, db_url=None):
-    """Clean, extract skills, and upsert Muse jobs into PostgreSQL."""
+    Pass an open ``db`` writer to reuse its connection and caches across
+    calls; the batch is committed and the caller finishes the writer.
+    """
     from market_analyzer.cleaner import extract_salary, extract_location_info
 
-    db = _JobDBWriter(db_url)
+    owns_db = db is None
+    if owns_db:
+        db = _JobDBWriter(db_url)
 
+    parsed = []
     for job in jobs:
         try:
             external_id = f"muse_{job.get('id', '')}"
@@ -502,14 +655,12 @@ def save_muse_jobs_to_db(jobs, db_url=None):
             pub_date = job.get("publication_date")
             job_url = job.get("refs", {}).get("landing_page")
 
-            company_id = db.get_or_create_company(company_name)
-            if not company_id:
+            if not company_name:
                 db.stats["errors"] += 1
                 continue
 
-            # Clean and extract
-            cleaned = clean_job_text(description)
-            skills_found = extract_skills_from_text(cleaned, db.taxonomy)
+            # Clean and extract; reposted descriptions come from the cache
+            cleaned, skills_found = db.analyze_description(description)
 
             # Salary from cleaned text
             salary_str = extract_salary(cleaned)
@@ -518,29 +669,35 @@ def save_muse_jobs_to_db(jobs, db_url=None):
             # Location / remote
             cities, is_remote = extract_location_info(locations)
 
-            job_id = db.upsert_job(
-                external_id, title, company_id, cleaned,
-                salary_min, salary_max, is_remote, pub_date, job_url,
-            )
-
             # Link all locations
+            location_keys = []
             if cities:
                 for city_name in cities:
                     # Try to split "New York, NY" style
                     parts = city_name.split(",")
                     city = parts[0].strip()
                     state = parts[1].strip() if len(parts) > 1 else None
-                    db.link_location(job_id, city, state)
+                    location_keys.append((city, state))
             elif is_remote:
-                db.link_location(job_id, "Remote", None)
+                location_keys.append(("Remote", None))
 
-            db.link_skills(job_id, skills_found)
+            parsed.append((
+                external_id, title, company_name, cleaned,
+                salary_min, salary_max, is_remote, pub_date, job_url,
+                location_keys, skills_found,
+            ))
 
         except Exception as e:
             print(f"Error processing job '{job.get('name', '?')}': {e}")
             db.stats["errors"] += 1
 
-    return db.finish("Muse Jobs Import")
+    db.add_parsed_jobs(parsed)
+
+    if owns_db:
+        return db.finish("Muse Jobs Import")
+    db.flush()
+    db.conn.commit()
+    return db.stats
 
 
 if __name__ == "__main__":
@@ -12,6 +12,9 @@ from firebase_admin import credentials as fb_credentials
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql:///market_analyzer?host=/var/run/postgresql")
+# Upper bound on pooled connections; sync endpoints run on FastAPI's worker
+# threads, so this caps how many requests can hold a connection at once
+PG_POOL_MAX = int(os.getenv("PG_POOL_MAX", "20"))
 
 
 def init_firebase():
@@ -41,10 +44,10 @@ def init_firebase():
 _pool: ThreadedConnectionPool | None = None
 
 
-def init_pool(db_url: str = None, minconn: int = 2, maxconn: int = 10):
+def init_pool(db_url: str = None, minconn: int = 2, maxconn: int = None):
     """Initialize the connection pool. Call once at server startup."""
     global _pool
-    _pool = ThreadedConnectionPool(minconn, maxconn, dsn=db_url or DATABASE_URL)
+    _pool = ThreadedConnectionPool(minconn, maxconn or PG_POOL_MAX, dsn=db_url or DATABASE_URL)
 
 
 def close_pool():
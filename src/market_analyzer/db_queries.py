@@ -1,12 +1,21 @@
 """Pure database query functions for the Market Analyzer API."""
 
 import math
+import re
 
 from psycopg2.extras import RealDictCursor
 
 from .db_config import get_db
+from .response_cache import cached
 
 
+def refresh_dashboard_stats(cursor):
+    """Rebuild the dashboard_stats view after jobs change (caller commits)."""
+    # CONCURRENTLY keeps the dashboard readable while the view rebuilds
+    cursor.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY dashboard_stats")
+
+
+@cached(ttl=120)
 def get_dashboard_stats(db_url: str = None) -> dict:
     """Aggregate stats for the dashboard page.
 
@@ -17,98 +26,30 @@ def get_dashboard_stats(db_url: str = None) -> dict:
     with get_db(db_url) as conn:
         c = conn.cursor(cursor_factory=RealDictCursor)
 
-        # Totals
-        c.execute("SELECT COUNT(*) AS count FROM jobs WHERE status = 'open'")
-        total_jobs = c.fetchone()["count"]
-        c.execute("SELECT COUNT(*) AS count FROM companies")
-        total_companies = c.fetchone()["count"]
-        c.execute(
-            """SELECT COUNT(*) AS count FROM skills s
-               JOIN skill_categories sc ON s.category_id = sc.id
-               WHERE sc.name != 'Soft_Skills'"""
-        )
-        total_skills = c.fetchone()["count"]
-        c.execute(
-            "SELECT COUNT(*) AS count FROM jobs WHERE (salary_min IS NOT NULL OR salary_max IS NOT NULL) AND (salary_min IS NULL OR salary_min >= 15000) AND (salary_max IS NULL OR salary_max >= 15000)"
-        )
-        jobs_with_salary = c.fetchone()["count"]
+        # Aggregates are precomputed by the dashboard_stats view
+        c.execute("SELECT * FROM dashboard_stats")
+        row = c.fetchone()
 
-        # Jobs by level
-        c.execute(
-            "SELECT job_level, COUNT(*) as cnt FROM jobs GROUP BY job_level ORDER BY cnt DESC"
-        )
+        total_jobs = row["total_jobs"]
+        remote_count = row["remote_count"]
+        onsite_count = total_jobs - remote_count
         jobs_by_level = [
-            {"level": row["job_level"] or "Not Specified", "count": row["cnt"]}
-            for row in c.fetchall()
+            {"level": r["job_level"] or "Not Specified", "count": r["cnt"]}
+            for r in row["jobs_by_level"]
         ]
-
-        # Remote vs onsite
-        c.execute("SELECT COUNT(*) AS count FROM jobs WHERE is_remote = TRUE")
-        remote_count = c.fetchone()["count"]
-        onsite_count = total_jobs - remote_count
-
-        # Top 15 technical skills (no soft skills)
-        c.execute(
-            """SELECT s.name, sc.name as cat_name, COUNT(*) as cnt
-               FROM job_skills js
-               JOIN skills s ON js.skill_id = s.id
-               JOIN skill_categories sc ON s.category_id = sc.id
-               WHERE sc.name != 'Soft_Skills'
-               GROUP BY s.id, s.name, sc.name
-               ORDER BY cnt DESC
-               LIMIT 15"""
-        )
         top_skills = [
-            {"skill": row["name"], "category": row["cat_name"], "count": row["cnt"]}
-            for row in c.fetchall()
+            {"skill": r["name"], "category": r["cat_name"], "count": r["cnt"]}
+            for r in row["top_skills"]
         ]
-
-        # Monthly posting trends
-        c.execute(
-            """SELECT TO_CHAR(publication_date, 'YYYY-MM') as month, COUNT(*) as cnt
-               FROM jobs
-               WHERE publication_date IS NOT NULL
-               GROUP BY month
-               ORDER BY month"""
-        )
         monthly_trends = [
-            {"month": row["month"], "count": row["cnt"]}
-            for row in c.fetchall()
+            {"month": r["month"], "count": r["cnt"]}
+            for r in row["monthly_trends"]
         ]
-
-        # Avg salary by language
-        c.execute(
-            """SELECT s.name, COUNT(*) as job_count,
-                      AVG((COALESCE(j.salary_min, 0) + COALESCE(j.salary_max, 0)) /
-                          CASE WHEN j.salary_min IS NOT NULL AND j.salary_max IS NOT NULL THEN 2
-                               WHEN j.salary_min IS NOT NULL THEN 1
-                               ELSE 1 END) as avg_salary
-               FROM job_skills js
-               JOIN skills s ON js.skill_id = s.id
-               JOIN skill_categories sc ON s.category_id = sc.id
-               JOIN jobs j ON js.job_id = j.id
-               WHERE sc.name = 'Languages'
-                 AND (j.salary_min IS NOT NULL OR j.salary_max IS NOT NULL)
-                 AND COALESCE(j.salary_min, j.salary_max) >= 15000
-               GROUP BY s.id, s.name
-               HAVING COUNT(*) >= 3
-               ORDER BY avg_salary DESC
-               LIMIT 10"""
-        )
         salary_by_language = [
-            {"language": row["name"], "avg_salary": round(float(row["avg_salary"])), "job_count": row["job_count"]}
-            for row in c.fetchall()
+            {"language": r["name"], "avg_salary": round(float(r["avg_salary"])), "job_count": r["job_count"]}
+            for r in row["salary_by_language"]
         ]
-
-        # Salary overview
-        c.execute(
-            """SELECT AVG(salary_min) as avg_min, AVG(salary_max) as avg_max,
-                      MIN(salary_min) as min_sal, MAX(salary_max) as max_sal
-               FROM jobs
-               WHERE salary_min IS NOT NULL AND salary_max IS NOT NULL
-                     AND salary_min >= 15000 AND salary_max >= 15000"""
-        )
-        salary_row = c.fetchone()
+        salary_row = row["salary_overview"]
 
         salary_overview = {
             "avg_min": round(float(salary_row["avg_min"]), 2) if salary_row["avg_min"] else None,
@@ -119,9 +60,9 @@ def get_dashboard_stats(db_url: str = None) -> dict:
 
         return {
             "total_jobs": total_jobs,
-            "total_companies": total_companies,
-            "total_skills": total_skills,
-            "jobs_with_salary": jobs_with_salary,
+            "total_companies": row["total_companies"],
+            "total_skills": row["total_skills"],
+            "jobs_with_salary": row["jobs_with_salary"],
             "jobs_by_level": jobs_by_level,
             "remote_count": remote_count,
             "onsite_count": onsite_count,
@@ -156,8 +97,21 @@ def get_jobs(
         if remote_only:
             where_clauses.append("j.is_remote = TRUE")
         if search:
-            where_clauses.append("(j.title ILIKE %s OR c.name ILIKE %s)")
-            params.extend([f"%{search}%", f"%{search}%"])
+            # Every search word must prefix a word of the title or company name;
+            # both sides are GIN-indexed tsvectors
+            words = re.findall(r"[^\W_]+", search)
+            if words:
+                tsquery = " & ".join(f"{w}:*" for w in words)
+                where_clauses.append(
+                    """(j.search_tsv @@ to_tsquery('simple', %s)
+                       OR j.company_id = ANY(ARRAY(SELECT id FROM companies
+                                                   WHERE search_tsv @@ to_tsquery('simple', %s))))"""
+                )
+                params.extend([tsquery, tsquery])
+            else:
+                # Punctuation-only input has no words to look up
+                where_clauses.append("(j.title ILIKE %s OR c.name ILIKE %s)")
+                params.extend([f"%{search}%", f"%{search}%"])
         if location:
             where_clauses.append(
                 """EXISTS (SELECT 1 FROM job_locations jl
@@ -193,11 +147,21 @@ def get_jobs(
         c.execute(count_sql, params)
         total = c.fetchone()["count"]
 
-        # Fetch page
+        # Fetch page; each row carries its locations and technical skills as
+        # JSON arrays, aggregated only for the rows that survive the LIMIT
         offset = (page - 1) * per_page
         query_sql = f"""
-            SELECT DISTINCT j.id, j.title, c.name as company, j.salary_min, j.salary_max,
-                   j.is_remote, j.job_level, j.publication_date, j.job_url
+            SELECT j.id, j.title, c.name as company, j.salary_min, j.salary_max,
+                   j.is_remote, j.job_level, j.publication_date, j.job_url,
+                   COALESCE((SELECT json_agg(l.city)
+                             FROM job_locations jl
+                             JOIN locations l on jl.location_id = l.id
+                             WHERE jl.job_id = j.id), '[]') AS locations,
+                   COALESCE((SELECT json_agg(json_build_object('name', s.name, 'category', sc.name))
+                             FROM job_skills js
+                             JOIN skills s ON js.skill_id = s.id
+                             JOIN skill_categories sc on s.category_id = sc.id
+                             WHERE js.job_id = j.id AND sc.name != 'Soft_Skills'), '[]') AS skills
             FROM jobs j
             JOIN companies c ON j.company_id = c.id
             WHERE {where_sql}
@@ -207,36 +171,6 @@ def get_jobs(
         c.execute(query_sql, params + [per_page, offset])
         job_rows = c.fetchall()
 
-        job_ids = [row["id"] for row in job_rows]
-        locations_map = {jid: [] for jid in job_ids}
-        skills_map = {jid: [] for jid in job_ids}
-        if job_ids:
-            placeholders = ",".join("%s" for _ in job_ids)
-
-            # Fetch all locations for these specific jobs
-            loc_sql = f"""
-                SELECT jl.job_id, l.city
-                FROM job_locations jl
-                JOIN locations l on jl.location_id = l.id
-                WHERE jl.job_id IN ({placeholders})
-            """
-            c.execute(loc_sql, job_ids)
-            for row in c.fetchall():
-                locations_map[row["job_id"]].append(row["city"])
-
-            skill_sql = f"""
-                SELECT js.job_id, s.name, sc.name as cat_name
-                FROM job_skills js
-                JOIN skills s ON js.skill_id = s.id
-                JOIN skill_categories sc on s.category_id = sc.id
-                WHERE js.job_id IN ({placeholders}) AND sc.name != 'Soft_Skills'
-            """
-            c.execute(skill_sql, job_ids)
-            for row in c.fetchall():
-                skills_map[row["job_id"]].append({
-                    "name": row["name"],
-                    "category": row["cat_name"]
-                    })
         jobs = []
         for row in job_rows:
             job_id = row["id"]
@@ -247,14 +181,14 @@ def get_jobs(
                 "id": job_id,
                 "title": row["title"],
                 "company": row["company"],
-                "locations": locations_map.get(job_id, []),
+                "locations": row["locations"],
                 "salary_min": float(salary_min) if salary_min is not None else None,
                 "salary_max": float(salary_max) if salary_max is not None else None,
                 "is_remote": bool(row["is_remote"]),
                 "level": row["job_level"],
                 "publication_date": pub_date.isoformat() if pub_date else None,
                 "job_url": row["job_url"],
-                "skills": skills_map.get(job_id, []),
+                "skills": row["skills"],
             })
 
         return {
@@ -266,6 +200,7 @@ def get_jobs(
         }
 
 
+@cached(ttl=300)
 def get_salary_insights(
     db_url: str = None, group_by: str = "level", names: list[str] | None = None
 ) -> dict:
@@ -294,9 +229,8 @@ def get_salary_insights(
                              AND salary_min >= 15000 AND salary_max >= 15000"""
             params: list = []
             if names:
-                placeholders = ",".join("%s" for _ in names)
-                base += f" AND job_level IN ({placeholders})"
-                params.extend(names)
+                base += " AND job_level = ANY(%s)"
+                params.append(names)
             base += " GROUP BY job_level ORDER BY avg_max DESC"
             c.execute(base, params)
             rows = c.fetchall()
@@ -312,9 +246,8 @@ def get_salary_insights(
                              AND j.salary_min >= 15000 AND j.salary_max >= 15000"""
             params = []
             if names:
-                placeholders = ",".join("%s" for _ in names)
-                base += f" AND l.city IN ({placeholders})"
-                params.extend(names)
+                base += " AND l.city = ANY(%s)"
+                params.append(names)
             base += " GROUP BY l.city HAVING COUNT(*) >= 1 ORDER BY avg_max DESC"
             if not names:
                 base += " LIMIT 25"
@@ -334,9 +267,8 @@ def get_salary_insights(
                              AND sc.name != 'Soft_Skills'"""
             params = []
             if names:
-                placeholders = ",".join("%s" for _ in names)
-                base += f" AND s.name IN ({placeholders})"
-                params.extend(names)
+                base += " AND s.name = ANY(%s)"
+                params.append(names)
             base += " GROUP BY s.id, s.name HAVING COUNT(*) >= 1 ORDER BY avg_max DESC"
             if not names:
                 base += " LIMIT 25"
@@ -368,31 +300,38 @@ def analyze_skill_gap(db_url: str = None, known_skills: list[str] = None) -> dic
     with get_db(db_url) as conn:
         c = conn.cursor(cursor_factory=RealDictCursor)
 
-        # Get all technical skills with demand counts
+        known_lower = list({s.lower() for s in (known_skills or [])})
+
+        # Partition technical skills into known / top 20 missing and total their
+        # demand in one aggregate row; the skill lists come back as JSON arrays
         c.execute(
-            """SELECT s.name, COUNT(*) as demand
-               FROM job_skills js
-               JOIN skills s ON js.skill_id = s.id
-               JOIN skill_categories sc ON s.category_id = sc.id
-               WHERE sc.name != 'Soft_Skills'
-               GROUP BY s.id, s.name
-               ORDER BY demand DESC"""
+            """WITH demand AS (
+                   SELECT s.name, COUNT(*) AS demand, LOWER(s.name) = ANY(%s) AS known
+                   FROM job_skills js
+                   JOIN skills s ON js.skill_id = s.id
+                   JOIN skill_categories sc ON s.category_id = sc.id
+                   WHERE sc.name != 'Soft_Skills'
+                   GROUP BY s.id, s.name
+               ), ranked AS (
+                   SELECT name, demand, known,
+                          ROW_NUMBER() OVER (PARTITION BY known ORDER BY demand DESC, name) AS rn
+                   FROM demand
+               )
+               SELECT COALESCE(json_agg(json_build_object('skill', name, 'demand', demand)
+                                        ORDER BY demand DESC, name) FILTER (WHERE known), '[]') AS known_skills,
+                      COALESCE(json_agg(json_build_object('skill', name, 'demand', demand)
+                                        ORDER BY demand DESC, name) FILTER (WHERE NOT known AND rn <= 20), '[]') AS missing_skills,
+                      COALESCE(SUM(demand), 0)::BIGINT AS total_demand,
+                      COALESCE(SUM(demand) FILTER (WHERE known), 0)::BIGINT AS known_demand,
+                      COUNT(*) AS total_skills
+               FROM ranked""",
+            (known_lower,),
         )
-        all_skills = c.fetchall()
+        row = c.fetchone()
 
-        known_lower = {s.lower() for s in (known_skills or [])}
-        total_demand = sum(row["demand"] for row in all_skills)
-
-        known_demand = 0
-        known_details = []
-        missing_skills = []
-
-        for row in all_skills:
-            if row["name"].lower() in known_lower:
-                known_demand += row["demand"]
-                known_details.append({"skill": row["name"], "demand": row["demand"]})
-            else:
-                missing_skills.append({"skill": row["name"], "demand": row["demand"]})
+        total_demand = row["total_demand"]
+        known_demand = row["known_demand"]
+        missing_skills = row["missing_skills"]
 
         coverage = round((known_demand / total_demand * 100), 1) if total_demand > 0 else 0
 
@@ -404,10 +343,10 @@ def analyze_skill_gap(db_url: str = None, known_skills: list[str] = None) -> dic
 
         return {
             "coverage_percent": coverage,
-            "known_skills": known_details,
-            "missing_skills": missing_skills[:20],
+            "known_skills": row["known_skills"],
+            "missing_skills": missing_skills,
             "recommendations": recommendations,
-            "total_technical_skills": len(all_skills),
+            "total_technical_skills": row["total_skills"],
         }
 
 
@@ -422,49 +361,42 @@ def analyze_resume_skills(db_url: str = None, extracted_skills: dict = None) ->
             for skill in skills:
                 all_extracted.append({"name": skill, "category": category})
 
-        # Get demand for each extracted skill
-        skills_with_demand = []
-        for s in all_extracted:
+        # Per-skill job counts come from the precomputed skill_job_counts view;
+        # names are lowercased once here and matched via the LOWER(name) index
+        extracted_lower = list({s["name"].lower() for s in all_extracted})
+
+        # Get demand for every extracted skill in one query
+        demand_by_name = {}
+        if extracted_lower:
             c.execute(
-                """SELECT COUNT(*) as demand
-                   FROM job_skills js
-                   JOIN skills sk ON js.skill_id = sk.id
-                   WHERE LOWER(sk.name) = LOWER(%s)""",
-                (s["name"],),
+                """SELECT LOWER(sk.name) AS name_lower, SUM(sjc.cnt)::BIGINT AS demand
+                   FROM skills sk
+                   JOIN skill_job_counts sjc ON sjc.skill_id = sk.id
+                   WHERE LOWER(sk.name) = ANY(%s)
+                   GROUP BY LOWER(sk.name)""",
+                (extracted_lower,),
             )
-            row = c.fetchone()
-            skills_with_demand.append({
+            demand_by_name = {r["name_lower"]: r["demand"] for r in c.fetchall()}
+        skills_with_demand = [
+            {
                 "name": s["name"],
                 "category": s["category"],
-                "demand": row["demand"],
-            })
+                "demand": demand_by_name.get(s["name"].lower(), 0),
+            }
+            for s in all_extracted
+        ]
 
         # Get top demanded technical skills the resume is missing
-        extracted_lower = {s["name"].lower() for s in all_extracted}
-        if extracted_lower:
-            placeholders = ",".join("%s" for _ in extracted_lower)
-            c.execute(
-                f"""SELECT s.name, sc.name as category, COUNT(*) as demand
-                   FROM job_skills js
-                   JOIN skills s ON js.skill_id = s.id
-                   JOIN skill_categories sc ON s.category_id = sc.id
-                   WHERE sc.name != 'Soft_Skills' AND LOWER(s.name) NOT IN ({placeholders})
-                   GROUP BY s.id, s.name, sc.name
-                   ORDER BY demand DESC
-                   LIMIT 15""",
-                list(extracted_lower),
-            )
-        else:
-            c.execute(
-                """SELECT s.name, sc.name as category, COUNT(*) as demand
-                   FROM job_skills js
-                   JOIN skills s ON js.skill_id = s.id
-                   JOIN skill_categories sc ON s.category_id = sc.id
-                   WHERE sc.name != 'Soft_Skills'
-                   GROUP BY s.id, s.name, sc.name
-                   ORDER BY demand DESC
-                   LIMIT 15"""
-            )
+        c.execute(
+            """SELECT s.name, sc.name as category, sjc.cnt as demand
+               FROM skill_job_counts sjc
+               JOIN skills s ON sjc.skill_id = s.id
+               JOIN skill_categories sc ON s.category_id = sc.id
+               WHERE sc.name != 'Soft_Skills' AND LOWER(s.name) != ALL(%s)
+               ORDER BY demand DESC
+               LIMIT 15""",
+            (extracted_lower,),
+        )
         missing = c.fetchall()
 
         missing_skills = [
@@ -474,8 +406,8 @@ def analyze_resume_skills(db_url: str = None, extracted_skills: dict = None) ->
 
         # Calculate readiness score
         c.execute(
-            """SELECT COUNT(DISTINCT s.id) AS count FROM job_skills js
-               JOIN skills s ON js.skill_id = s.id
+            """SELECT COUNT(*) AS count FROM skill_job_counts sjc
+               JOIN skills s ON sjc.skill_id = s.id
                JOIN skill_categories sc ON s.category_id = sc.id
                WHERE sc.name != 'Soft_Skills'"""
         )
@@ -495,6 +427,7 @@ def analyze_resume_skills(db_url: str = None, extracted_skills: dict = None) ->
         }
 
 
+@cached(ttl=600)
 def get_filter_levels(db_url: str = None) -> list[str]:
     """Distinct job levels for dropdowns."""
     with get_db(db_url) as conn:
@@ -506,6 +439,7 @@ def get_filter_levels(db_url: str = None) -> list[str]:
         return [row["job_level"] for row in rows]
 
 
+@cached(ttl=600)
 def get_filter_locations(db_url: str = None) -> list[dict]:
     """Distinct locations with job counts for dropdowns."""
     with get_db(db_url) as conn:
@@ -0,0 +1,240 @@
+"""Bulk write helpers shared by the collector's job writer and the CSV migrator."""
+
+import io
+
+from psycopg2.extras import execute_values
+
+# Rows per multi-row statement; larger pages stop paying off in PostgreSQL
+PAGE_SIZE = 1000
+
+
+def location_key(city, state, country="USA"):
+    """
+    Cache key for a location. The locations unique index treats NULL and ''
+    states as equal, so both map to None; otherwise one multi-row upsert
+    could hit the same row twice.
+    """
+    return (city, state or None, country)
+
+
+class LookupCache:
+    """
+    Name -> id caches for companies, locations, skill categories and skills.
+
+    Missing rows are created with one multi-row INSERT ... ON CONFLICT per
+    table; the no-op DO UPDATE makes RETURNING yield existing ids too, and
+    xmax = 0 only for fresh inserts.
+    """
+
+    def __init__(self):
+        self.companies = {}   # name -> id
+        self.locations = {}   # (city, state, country) -> id
+        self.categories = {}  # name -> id
+        self.skills = {}      # (skill name, category name) -> id
+
+    def load(self, cursor):
+        """Seed the caches from existing rows so only new values hit the DB."""
+        cursor.execute("SELECT name, id FROM companies")
+        self.companies.update(cursor.fetchall())
+        cursor.execute("SELECT city, state, country, id FROM locations")
+        self.locations.update(
+            (location_key(city, state, country), lid)
+            for city, state, country, lid in cursor.fetchall()
+        )
+        cursor.execute("SELECT name, id FROM skill_categories")
+        self.categories.update(cursor.fetchall())
+        cursor.execute(
+            """SELECT s.name, sc.name, s.id FROM skills s
+               JOIN skill_categories sc ON s.category_id = sc.id"""
+        )
+        self.skills.update(((name, category), sid) for name, category, sid in cursor.fetchall())
+
+    def reload(self, cursor):
+        """Drop cached ids (e.g. ones created by a rolled-back transaction) and load again."""
+        for cache in (self.companies, self.locations, self.categories, self.skills):
+            cache.clear()
+        self.load(cursor)
+
+    def create_missing(self, cursor, companies=(), location_keys=(), skill_keys=(),
+                       category_names=()):
+        """
+        Create every (name, short_name) company, (city, state, country)
+        location, (skill, category) skill and category not already cached.
+        Returns the number of companies, locations and categories actually
+        inserted.
+        """
+        created = {"companies": 0, "locations": 0, "categories": 0}
+
+        companies = {name: short_name for name, short_name in companies
+                     if name not in self.companies}
+        if companies:
+            for name, company_id, inserted in execute_values(
+                cursor,
+                """INSERT INTO companies (name, short_name) VALUES %s
+                   ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name
+                   RETURNING name, id, (xmax = 0)""",
+                list(companies.items()), page_size=PAGE_SIZE, fetch=True,
+            ):
+                self.companies[name] = company_id
+                created["companies"] += inserted
+
+        locations = {location_key(*key) for key in location_keys}
+        locations = {key for key in locations if key not in self.locations}
+        if locations:
+            for city, state, country, location_id, inserted in execute_values(
+                cursor,
+                """INSERT INTO locations (city, state, country) VALUES %s
+                   ON CONFLICT (city, COALESCE(state, ''), country) DO UPDATE SET city = EXCLUDED.city
+                   RETURNING city, state, country, id, (xmax = 0)""",
+                list(locations), page_size=PAGE_SIZE, fetch=True,
+            ):
+                self.locations[location_key(city, state, country)] = location_id
+                created["locations"] += inserted
+
+        skills = {key for key in skill_keys if key not in self.skills}
+        categories = [(name,) for name in {category for _, category in skills}.union(category_names)
+                      if name not in self.categories]
+        if categories:
+            for name, category_id, inserted in execute_values(
+                cursor,
+                """INSERT INTO skill_categories (name) VALUES %s
+                   ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name
+                   RETURNING name, id, (xmax = 0)""",
+                categories, fetch=True,
+            ):
+                self.categories[name] = category_id
+                created["categories"] += inserted
+        if skills:
+            category_names = {cid: name for name, cid in self.categories.items()}
+            for name, category_id, skill_id in execute_values(
+                cursor,
+                """INSERT INTO skills (name, category_id) VALUES %s
+                   ON CONFLICT (name, category_id) DO UPDATE SET name = EXCLUDED.name
+                   RETURNING name, category_id, id""",
+                [(name, self.categories[category]) for name, category in skills],
+                page_size=PAGE_SIZE, fetch=True,
+            ):
+                self.skills[(name, category_names[category_id])] = skill_id
+
+        return created
+
+
+def upsert_jobs(cursor, rows, page_size=PAGE_SIZE):
+    """
+    UPSERT jobs rows by external ID, as (external_job_id, title, company_id,
+    description, salary_min, salary_max, is_remote, publication_date,
+    job_url, fetched_at, last_seen_at) tuples. Returns (external_job_id,
+    id, inserted) per row; xmax = 0 only for fresh inserts.
+    """
+    return execute_values(
+        cursor,
+        """INSERT INTO jobs (
+            external_job_id, title, company_id, description,
+            salary_min, salary_max, is_remote, publication_date, job_url,
+            fetched_at, last_seen_at, status
+        ) VALUES %s
+        ON CONFLICT (external_job_id) DO UPDATE SET
+            title = EXCLUDED.title, company_id = EXCLUDED.company_id,
+            description = EXCLUDED.description,
+            salary_min = EXCLUDED.salary_min, salary_max = EXCLUDED.salary_max,
+            is_remote = EXCLUDED.is_remote, publication_date = EXCLUDED.publication_date,
+            job_url = EXCLUDED.job_url, fetched_at = EXCLUDED.fetched_at,
+            updated_at = EXCLUDED.fetched_at, status = 'open',
+            last_seen_at = EXCLUDED.last_seen_at
+        RETURNING external_job_id, id, (xmax = 0) AS inserted""",
+        rows,
+        template="(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'open')",
+        page_size=page_size, fetch=True,
+    )
+
+
+def copy_links(cursor, table, column, rows):
+    """
+    COPY (job_id, <column>) pairs into a temp staging table, then merge
+    into the junction table so existing links are skipped: three
+    statements however many pairs a batch holds.
+    """
+    staging = f"{table}_staging"
+    cursor.execute(f"CREATE TEMP TABLE IF NOT EXISTS {staging} (job_id INTEGER, {column} INTEGER)")
+    cursor.execute(f"TRUNCATE {staging}")
+    buf = io.StringIO("".join(f"{job_id}\t{other_id}\n" for job_id, other_id in rows))
+    cursor.copy_expert(f"COPY {staging} (job_id, {column}) FROM STDIN", buf)
+    cursor.execute(
+        f"""INSERT INTO {table} (job_id, {column})
+            SELECT DISTINCT job_id, {column} FROM {staging}
+            ON CONFLICT DO NOTHING"""
+    )
+
+
+class JobBatch:
+    """
+    Prepared jobs, as (jobs row values, location ids, skill ids), written
+    ``size`` at a time with one multi-row UPSERT plus one COPY merge per
+    junction table. Counts are added to the caller's ``stats`` dict under
+    jobs_imported / jobs_updated / errors and ``links_stat``.
+    """
+
+    def __init__(self, cursor, stats, size=PAGE_SIZE, links_stat="skill_links_created"):
+        self.cursor = cursor
+        self.stats = stats
+        self.size = size
+        self.links_stat = links_stat
+        self.written = 0
+        self._pending = []
+        self._pending_ids = set()
+
+    def add(self, job_values, location_ids, skill_ids):
+        # A job may only be upserted once per statement
+        if job_values[0] in self._pending_ids:
+            self.flush()
+        self._pending.append((job_values, location_ids, skill_ids))
+        self._pending_ids.add(job_values[0])
+        if len(self._pending) >= self.size:
+            self.flush()
+
+    def discard(self):
+        """Drop queued jobs without writing them."""
+        self._pending.clear()
+        self._pending_ids.clear()
+
+    def flush(self):
+        """Write the queued jobs; a failed batch is rolled back and counted as errors."""
+        if not self._pending:
+            return
+        # A savepoint keeps one bad batch from aborting the whole transaction
+        self.cursor.execute("SAVEPOINT job_batch")
+        try:
+            counts = self._write(self._pending)
+            self.cursor.execute("RELEASE SAVEPOINT job_batch")
+        except Exception as e:
+            self.cursor.execute("ROLLBACK TO SAVEPOINT job_batch")
+            print(f"Error writing batch of {len(self._pending)} jobs: {e}")
+            self.stats["errors"] += len(self._pending)
+        else:
+            inserted, updated, skill_links = counts
+            self.stats["jobs_imported"] += inserted
+            self.stats["jobs_updated"] += updated
+            self.stats[self.links_stat] += skill_links
+            self.written += len(self._pending)
+        self.discard()
+
+    def _write(self, pending):
+        job_ids = {}
+        inserted = 0
+        for external_id, job_id, was_inserted in upsert_jobs(
+            self.cursor, [values for values, _, _ in pending], self.size
+        ):
+            job_ids[external_id] = job_id
+            inserted += was_inserted
+
+        location_rows = []
+        skill_rows = []
+        for values, location_ids, skill_ids in pending:
+            job_id = job_ids[values[0]]
+            location_rows.extend((job_id, location_id) for location_id in location_ids)
+            skill_rows.extend((job_id, skill_id) for skill_id in skill_ids)
+        if location_rows:
+            copy_links(self.cursor, "job_locations", "location_id", location_rows)
+        if skill_rows:
+            copy_links(self.cursor, "job_skills", "skill_id", skill_rows)
+        return inserted, len(job_ids) - inserted, len(skill_rows)
@@ -1,14 +1,19 @@
 # Recommends the most in-demand skills for a given location by querying
 # the jobs database and ranking skills by frequency of appearance.
 
-from psycopg2.extras import RealDictCursor
+from collections import defaultdict
 
 from .db_config import get_db
 
 
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
 class LocationSkillRecommender:
     # Initializes the recommender by loading all known locations from the database
-    def __init__(self, db_url):
+    def __init__(self, db_url=None):
+        # None borrows pooled connections (the server); tests pass a direct URL
         self.db_url = db_url
         with get_db(db_url) as conn:
             cursor = conn.cursor()
@@ -18,8 +23,34 @@ class LocationSkillRecommender:
                 SELECT 'Remote' WHERE EXISTS (SELECT 1 FROM jobs WHERE is_remote = TRUE)
             """)
             self.known_locations = [row[0] for row in cursor.fetchall()]
+        # Lowercased names are built once so lookups don't re-lower every location
+        self._locations_by_lower = {}
+        for loc in self.known_locations:
+            self._locations_by_lower.setdefault(loc.lower(), loc)
+        # Trigram -> positions in _lower_names, so partial matches only test
+        # locations that share every trigram of the query
+        self._lower_names = list(self._locations_by_lower)
+        self._trigram_index = defaultdict(set)
+        for pos, lower in enumerate(self._lower_names):
+            for gram in _trigrams(lower):
+                self._trigram_index[gram].add(pos)
         print(f"Location engine ready. {len(self.known_locations)} locations available.")
 
+    def _find_partial(self, search):
+        """Return the first known location whose name contains search, or None."""
+        grams = _trigrams(search)
+        if grams:
+            postings = sorted((self._trigram_index.get(g, set()) for g in grams), key=len)
+            candidates = sorted(set.intersection(*postings))
+        else:
+            # Queries under three characters have no trigrams to narrow by
+            candidates = range(len(self._lower_names))
+        for pos in candidates:
+            lower = self._lower_names[pos]
+            if search in lower:
+                return self._locations_by_lower[lower]
+        return None
+
     def get_location_trends(self, location_name, limit=10):
         """
         Retrieves the most in-demand skills for a specific location or remote positions.
@@ -31,36 +62,46 @@ class LocationSkillRecommender:
         The SQL query:
         1. Filters jobs by location: either j.is_remote=TRUE for "Remote" or exact city match
         2. Joins to skills through job_skills (all skills required for those jobs)
-        3. Counts distinct jobs requiring each skill
+        3. Counts the matching jobs requiring each skill
         4. Returns top skills sorted by frequency
         """
         search = location_name.lower()
 
-        matches = [loc for loc in self.known_locations if loc.lower() == search]
-        if not matches:
-            matches = [loc for loc in self.known_locations if search in loc.lower()]
-        if not matches:
+        target = self._locations_by_lower.get(search)
+        if target is None:
+            target = self._find_partial(search)
+        if target is None:
             return None
 
-        target = matches[0]
+        # Pick the location predicate up front so the planner sees a plain
+        # (indexable) filter instead of an OR across both branches
+        if target == "Remote":
+            location_filter = "j.is_remote = TRUE"
+        else:
+            location_filter = "j.is_remote = FALSE AND l.city = %(loc)s"
+
         with get_db(self.db_url) as conn:
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            cursor = conn.cursor()
 
-            cursor.execute("""
-                SELECT s.name, sc.name AS category, COUNT(DISTINCT j.id) AS count
-                FROM jobs j
-                JOIN job_locations jl ON j.id = jl.job_id
-                JOIN locations l ON jl.location_id = l.id
-                JOIN job_skills js ON j.id = js.job_id
+            # Matching jobs are collected as a semi-join so each job appears
+            # once; (job_id, skill_id) is unique, so COUNT(*) needs no DISTINCT
+            cursor.execute(f"""
+                SELECT s.name, sc.name AS category, COUNT(*) AS count
+                FROM job_skills js
                 JOIN skills s ON js.skill_id = s.id
                 JOIN skill_categories sc ON s.category_id = sc.id
-                WHERE (j.is_remote = TRUE AND %(loc)s = 'Remote')
-                   OR (j.is_remote = FALSE AND l.city = %(loc)s)
+                WHERE js.job_id IN (
+                    SELECT j.id
+                    FROM jobs j
+                    JOIN job_locations jl ON j.id = jl.job_id
+                    JOIN locations l ON jl.location_id = l.id
+                    WHERE {location_filter}
+                )
                 GROUP BY s.id, s.name, sc.name
                 ORDER BY count DESC
                 LIMIT %(limit)s
             """, {"loc": target, "limit": limit})
 
-            top_skills = [{"skill": row["name"], "category": row["category"], "count": row["count"]}
-                          for row in cursor.fetchall()]
+            top_skills = [{"skill": name, "category": category, "count": count}
+                          for name, category, count in cursor.fetchall()]
             return {"location": target, "top_skills": top_skills}
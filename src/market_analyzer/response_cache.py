@@ -0,0 +1,48 @@
+"""Short-lived in-process cache for read-mostly API queries."""
+
+import functools
+import threading
+import time
+
+# Oldest entries are evicted past this size (salary insights accept
+# arbitrary name filters, so keys are not a fixed set)
+MAX_ENTRIES = 256
+
+_entries: dict[tuple, tuple[float, object]] = {}
+_lock = threading.Lock()
+
+
+def cached(ttl: float):
+    """Cache a db_queries function's result for *ttl* seconds.
+
+    Only pooled calls (db_url=None, i.e. the server) are cached; a call with
+    an explicit db_url always queries that database.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(db_url: str = None, *args, **kwargs):
+            if db_url is not None:
+                return fn(db_url, *args, **kwargs)
+
+            key = (fn.__name__, repr(args), repr(sorted(kwargs.items())))
+            now = time.monotonic()
+            with _lock:
+                entry = _entries.get(key)
+            if entry and entry[0] > now:
+                return entry[1]
+
+            result = fn(None, *args, **kwargs)
+            with _lock:
+                _entries.pop(key, None)
+                if len(_entries) >= MAX_ENTRIES:
+                    del _entries[next(iter(_entries))]
+                _entries[key] = (now + ttl, result)
+            return result
+        return wrapper
+    return decorator
+
+
+def reset():
+    """Drop all cached results (for testing)."""
+    with _lock:
+        _entries.clear()
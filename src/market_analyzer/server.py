@@ -2,6 +2,7 @@
 # Defines all REST endpoints for job browsing, salary insights, skill analysis,
 # resume parsing/storage, bullet tailoring, and user authentication.
 
+import heapq
 import tempfile
 import os
 from contextlib import asynccontextmanager
@@ -10,7 +11,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from pathlib import Path
 from pydantic import BaseModel
 
-from .db_config import DATABASE_URL, init_pool, close_pool, get_db, init_firebase
+from .db_config import init_pool, close_pool, get_db, init_firebase
 from .skill_recommender import SkillRecommender
 from .location_recommender import LocationSkillRecommender
 from . import db_queries
@@ -40,8 +41,9 @@ async def lifespan(app):
     init_firebase()
     init_pool()
     try:
-        skill_brain = SkillRecommender(DATABASE_URL)
-        location_brain = LocationSkillRecommender(DATABASE_URL)
+        # Query through the pool rather than opening a connection per request
+        skill_brain = SkillRecommender()
+        location_brain = LocationSkillRecommender()
     except Exception:
         skill_brain = None
         location_brain = None
@@ -146,8 +148,10 @@ def locations_autocomplete(q: str = "", limit: int = 8):
     if not location_brain:
         raise HTTPException(status_code=500, detail="Location database not available")
     try:
-        matches = [loc for loc in location_brain.known_locations if loc.lower().startswith(q.lower())]
-        return {"suggestions": sorted(matches)[:limit]}
+        prefix = q.lower()
+        matches = (loc for loc in location_brain.known_locations if loc.lower().startswith(prefix))
+        # Partial selection of the first `limit` names instead of sorting every match
+        return {"suggestions": heapq.nsmallest(limit, matches)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error filtering locations: {str(e)}")
 
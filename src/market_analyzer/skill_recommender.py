@@ -1,14 +1,20 @@
 # Recommends related skills based on co-occurrence patterns in job listings.
 # Uses conditional probability to find skills that frequently appear together.
 
-from psycopg2.extras import RealDictCursor
-
 from .db_config import get_db
 
 
+def refresh_skill_counts(cursor):
+    """Rebuild the co-occurrence views after job_skills changes (caller commits)."""
+    # CONCURRENTLY keeps the views readable by the server while they rebuild
+    cursor.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY skill_job_counts")
+    cursor.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY skill_pair_counts")
+
+
 class SkillRecommender:
     # Connects to the database and verifies the skills table is populated
-    def __init__(self, db_url):
+    def __init__(self, db_url=None):
+        # None borrows pooled connections (the server); tests pass a direct URL
         self.db_url = db_url
         with get_db(db_url) as conn:
             cursor = conn.cursor()
@@ -20,40 +26,42 @@ class SkillRecommender:
         """
         Finds skills most frequently co-occurring with the target skill using conditional probability.
 
-        The SQL query:
-        1. Finds all jobs containing the target skill
-        2. Identifies other skills in those same jobs (co-occurrences)
+        The SQL query reads the precomputed skill_pair_counts / skill_job_counts views:
+        1. Sums the number of jobs containing the target skill
+        2. Sums, per other skill, the jobs containing both (co-occurrences)
         3. Calculates conditional probability: P(skill2 | target_skill) =
            count(jobs with both) / count(jobs with target)
         4. Returns top skills by probability, sorted descending
         """
         skill_lower = skill_name.lower()
         with get_db(self.db_url) as conn:
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            cursor = conn.cursor()
 
-            cursor.execute("SELECT id FROM skills WHERE LOWER(name) = %s LIMIT 1", (skill_lower,))
-            if cursor.fetchone() is None:
+            # Resolve the target to skill ids once so the co-occurrence query
+            # compares integer ids instead of lowercasing every joined row
+            cursor.execute("SELECT id FROM skills WHERE LOWER(name) = %s", (skill_lower,))
+            target_ids = [row[0] for row in cursor.fetchall()]
+            if not target_ids:
                 return None
 
             cursor.execute("""
+                WITH total AS (
+                    SELECT SUM(cnt) AS n FROM skill_job_counts
+                    WHERE skill_id = ANY(%s)
+                )
                 SELECT s2.name,
                        sc.name AS category,
-                       COUNT(*)::FLOAT / (
-                           SELECT COUNT(*) FROM job_skills js_inner
-                           JOIN skills s_inner ON js_inner.skill_id = s_inner.id
-                           WHERE LOWER(s_inner.name) = %s
-                       ) AS score
-                FROM job_skills js1
-                JOIN job_skills js2 ON js1.job_id = js2.job_id
-                JOIN skills s1 ON js1.skill_id = s1.id
-                JOIN skills s2 ON js2.skill_id = s2.id
+                       SUM(p.cnt)::FLOAT / total.n AS score
+                FROM skill_pair_counts p
+                JOIN skills s2 ON p.b_id = s2.id
                 JOIN skill_categories sc ON s2.category_id = sc.id
-                WHERE LOWER(s1.name) = %s AND LOWER(s2.name) != %s
-                GROUP BY s2.id, s2.name, sc.name
+                CROSS JOIN total
+                WHERE p.a_id = ANY(%s) AND p.b_id != ALL(%s)
+                GROUP BY s2.id, s2.name, sc.name, total.n
                 ORDER BY score DESC
                 LIMIT %s
-            """, (skill_lower, skill_lower, skill_lower, limit))
+            """, (target_ids, target_ids, target_ids, limit))
 
-            results = [{"skill": row["name"], "category": row["category"], "score": round(row["score"], 2)}
-                       for row in cursor.fetchall()]
+            results = [{"skill": name, "category": category, "score": round(score, 2)}
+                       for name, category, score in cursor.fetchall()]
             return results
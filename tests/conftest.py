@@ -6,6 +6,9 @@ import pytest
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
+from market_analyzer.db_queries import refresh_dashboard_stats
+from market_analyzer.skill_recommender import refresh_skill_counts
+
 ROOT_DIR = Path(__file__).resolve().parent.parent
 SCHEMA_PATH = ROOT_DIR / "data" / "schema.sql"
 MIGRATIONS_DIR = ROOT_DIR / "migrations"
@@ -119,6 +122,9 @@ def db_url():
         conn.commit()
 
     _seed_database(conn)
+    refresh_skill_counts(conn.cursor())
+    refresh_dashboard_stats(conn.cursor())
+    conn.commit()
     conn.close()
 
     return TEST_DB_URL
@@ -164,15 +170,16 @@ def test_client(db_url, monkeypatch):
     """
     from market_analyzer.skill_recommender import SkillRecommender
     from market_analyzer.location_recommender import LocationSkillRecommender
-    from market_analyzer import server, db_config
+    from market_analyzer import server, db_config, response_cache
     from starlette.testclient import TestClient
 
-    # Point the pool at the test database
+    # Point the pool at the test database; cached results belong to the last one
     db_config.close_pool()
     db_config.init_pool(db_url)
+    response_cache.reset()
 
-    monkeypatch.setattr(server, "skill_brain", SkillRecommender(db_url))
-    monkeypatch.setattr(server, "location_brain", LocationSkillRecommender(db_url))
+    monkeypatch.setattr(server, "skill_brain", SkillRecommender())
+    monkeypatch.setattr(server, "location_brain", LocationSkillRecommender())
     return TestClient(server.app)
 
 
@@ -1,9 +1,16 @@
 """Tests for NLP / text-processing helpers in cleaner.py."""
 
+import json
+
+import pandas as pd
+
+from market_analyzer import cleaner
 from market_analyzer.cleaner import (
     clean_job_text,
+    load_job_data,
     extract_location_info,
     extract_salary,
+    build_skill_index,
     extract_skills_from_text,
 )
 
@@ -42,6 +49,16 @@ class TestCleanJobText:
     def test_handles_empty_string(self):
         assert clean_job_text("") == ""
 
+    def test_removes_header_footer_and_comments(self):
+        html = "<header>Nav</header><!-- hidden --><p>Body</p><footer>Legal</footer>"
+        assert clean_job_text(html) == "Body"
+
+    def test_handles_whitespace_only(self):
+        assert clean_job_text("   ") == ""
+
+    def test_decodes_entities_without_tags(self):
+        assert clean_job_text("R&amp;D team") == "R D team"
+
 
 # ── extract_location_info ───────────────────────────────────────
 
@@ -132,3 +149,35 @@ class TestExtractSkillsFromText:
 
     def test_empty_taxonomy_returns_empty(self):
         assert extract_skills_from_text("python developer", {}) == {}
+
+    def test_skill_index_matches_taxonomy_scan(self, mock_taxonomy):
+        text = "python and react developer using c++"
+        index = build_skill_index(mock_taxonomy)
+        expected = extract_skills_from_text(text, mock_taxonomy)
+        result = extract_skills_from_text(text, mock_taxonomy, index)
+        assert {k: sorted(v) for k, v in result.items()} == \
+            {k: sorted(v) for k, v in expected.items()}
+
+
+# ── load_job_data ───────────────────────────────────────────────
+
+
+class TestLoadJobData:
+    def test_chunked_load_matches_single_normalize(self, tmp_path, monkeypatch):
+        jobs = [
+            {"id": i, "name": f"Job {i}", "company": {"name": f"Co {i % 3}"},
+             "locations": [{"name": "Remote"}]}
+            for i in range(7)
+        ]
+        jobs[5]["level"] = "Senior"
+        path = tmp_path / "jobs.json"
+        path.write_text(json.dumps(jobs))
+        monkeypatch.setattr(cleaner, "LOAD_CHUNK_SIZE", 3)
+
+        df = load_job_data(path)
+        pd.testing.assert_frame_equal(df, pd.json_normalize(jobs))
+
+    def test_empty_list(self, tmp_path):
+        path = tmp_path / "jobs.json"
+        path.write_text("[]")
+        assert load_job_data(path).empty
@@ -1,5 +1,6 @@
 """Tests for collector.py: _JobDBWriter, save_google_jobs_to_db, save_muse_jobs_to_db."""
 
+import psycopg2
 import pytest
 from tests.conftest import TEST_DB_URL
 
@@ -31,6 +32,49 @@ class TestJobDBWriter:
         assert id1 == id2
         assert db_writer.stats["companies_created"] == 1
 
+    def test_preloads_existing_ids(self, db_url, db_writer):
+        from market_analyzer.collector import _JobDBWriter
+        cid = db_writer.get_or_create_company("PreloadCo")
+        lid = db_writer.get_or_create_location("PreloadCity", "WA")
+        db_writer.conn.commit()
+        fresh = _JobDBWriter(db_url)
+        try:
+            assert fresh._company_cache["PreloadCo"] == cid
+            assert fresh._location_cache[("PreloadCity", "WA", "USA")] == lid
+        finally:
+            fresh.conn.close()
+
+    def test_prefetch_creates_missing_rows(self, db_writer):
+        db_writer.prefetch(
+            ["BulkCo", "BulkCo", "OtherBulkCo"],
+            [("BulkCity", "OR"), ("BulkCity", "OR")],
+            [("zig", "Languages"), ("fuzzing", "NewCategory")],
+        )
+        assert db_writer.stats["companies_created"] == 2
+        assert db_writer.stats["locations_created"] == 1
+        cid = db_writer._company_cache["BulkCo"]
+        assert db_writer.get_or_create_company("BulkCo") == cid
+        sid = db_writer._skill_cache[("fuzzing", "NewCategory")]
+        assert db_writer.get_or_create_skill("fuzzing", "NewCategory") == sid
+
+    def test_prefetch_blank_and_null_state_share_a_row(self, db_writer):
+        # "X, " parses to state "", which the unique index equates with NULL
+        db_writer.prefetch([], [("BlankState", None), ("BlankState", "")], [])
+        assert db_writer.stats["locations_created"] == 1
+        lid = db_writer.get_or_create_location("BlankState", None)
+        assert db_writer.get_or_create_location("BlankState", "") == lid
+
+    def test_rollback_recovers_after_failed_write(self, db_writer):
+        db_writer.prefetch(["RolledBackCo"], [], [])
+        with pytest.raises(psycopg2.Error):
+            db_writer.cursor.execute("SELECT 1 / 0")
+        db_writer.rollback()
+        # The id created before the failure was rolled back with it
+        assert "RolledBackCo" not in db_writer._company_cache
+        cid = db_writer.get_or_create_company("RolledBackCo")
+        db_writer.cursor.execute("SELECT name FROM companies WHERE id = %s", (cid,))
+        assert db_writer.cursor.fetchone() == ("RolledBackCo",)
+
     def test_get_or_create_company_none(self, db_writer):
         assert db_writer.get_or_create_company(None) is None
         assert db_writer.get_or_create_company("") is None
@@ -97,6 +141,12 @@ class TestJobDBWriter:
         db_writer.link_skills(job_id, skills)
         assert db_writer.stats["skill_links_created"] == 3
 
+    def test_analyze_description_cached(self, db_writer):
+        first = db_writer.analyze_description("<p>Python and React</p>")
+        second = db_writer.analyze_description("<p>Python and React</p>")
+        assert second is first
+        assert db_writer.analyze_description.cache_info().hits == 1
+
     def test_finish(self, db_writer):
         stats = db_writer.finish("Test")
         assert isinstance(stats, dict)
@@ -137,6 +187,13 @@ class TestSaveGoogleJobsToDB:
         stats = save_google_jobs_to_db([job], db_url=db_url)
         assert stats["jobs_updated"] == 1
 
+    def test_reuses_open_writer(self, db_writer):
+        from market_analyzer.collector import save_google_jobs_to_db
+        save_google_jobs_to_db([self._make_google_job()], db=db_writer)
+        stats = save_google_jobs_to_db([self._make_google_job(job_id="gj_456")], db=db_writer)
+        assert stats["jobs_imported"] == 2
+        assert not db_writer.conn.closed
+
     def test_skips_missing_company(self, db_url):
         from market_analyzer.collector import save_google_jobs_to_db
         job = self._make_google_job(company_name="")
@@ -204,7 +261,16 @@ class TestSaveMuseJobsToDB:
         job = self._make_muse_job(locations=[{"name": "Flexible / Remote"}])
         stats = save_muse_jobs_to_db([job], db_url=db_url)
         assert stats["jobs_imported"] == 1
-        assert stats["locations_created"] >= 1
+        # The seeded Remote location is reused rather than duplicated
+        assert stats["locations_created"] == 0
+        with psycopg2.connect(db_url) as conn, conn.cursor() as cur:
+            cur.execute(
+                """SELECT l.city FROM job_locations jl
+                   JOIN jobs j ON j.id = jl.job_id
+                   JOIN locations l ON l.id = jl.location_id
+                   WHERE j.external_job_id = 'muse_12345'"""
+            )
+            assert cur.fetchall() == [("Remote",)]
 
     def test_handles_no_locations(self, db_url):
         from market_analyzer.collector import save_muse_jobs_to_db
@@ -226,3 +292,13 @@ class TestSaveMuseJobsToDB:
         ]
         stats = save_muse_jobs_to_db(jobs, db_url=db_url)
         assert stats["jobs_imported"] == 3
+
+    def test_repeated_job_in_one_batch(self, db_url):
+        from market_analyzer.collector import save_muse_jobs_to_db
+        jobs = [self._make_muse_job(), self._make_muse_job(name="Backend Developer II")]
+        stats = save_muse_jobs_to_db(jobs, db_url=db_url)
+        assert stats["jobs_imported"] == 1
+        assert stats["jobs_updated"] == 1
+        with psycopg2.connect(db_url) as conn, conn.cursor() as cur:
+            cur.execute("SELECT title FROM jobs WHERE external_job_id = 'muse_12345'")
+            assert cur.fetchall() == [("Backend Developer II",)]
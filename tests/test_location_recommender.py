@@ -30,6 +30,16 @@ class TestLocationSkillRecommender:
         assert result is not None
         assert result["location"] == "San Francisco"
 
+    def test_partial_match_mid_word(self, location_recommender):
+        result = location_recommender.get_location_trends("ancis")
+        assert result is not None
+        assert result["location"] == "San Francisco"
+
+    def test_partial_match_short_query(self, location_recommender):
+        result = location_recommender.get_location_trends("yo")
+        assert result is not None
+        assert result["location"] == "New York"
+
     def test_returns_none_for_unknown(self, location_recommender):
         assert location_recommender.get_location_trends("Atlantis") is None
 
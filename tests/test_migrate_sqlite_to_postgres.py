@@ -0,0 +1,76 @@
+"""Tests for scripts/migrate_sqlite_to_postgres.py."""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+import psycopg2
+import pytest
+
+# Add project root so we can import from scripts/
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from scripts.migrate_sqlite_to_postgres import migrate
+
+LEGACY_SCHEMA = """
+CREATE TABLE companies (id INTEGER PRIMARY KEY, name TEXT NOT NULL);
+CREATE TABLE locations (
+    id INTEGER PRIMARY KEY, city TEXT NOT NULL, state TEXT, country TEXT,
+    UNIQUE(city, state, country)
+);
+CREATE TABLE skill_categories (id INTEGER PRIMARY KEY, name TEXT NOT NULL);
+CREATE TABLE skills (id INTEGER PRIMARY KEY, name TEXT NOT NULL, category_id INTEGER);
+CREATE TABLE jobs (
+    id INTEGER PRIMARY KEY, external_job_id TEXT, title TEXT NOT NULL,
+    company_id INTEGER, salary_min REAL, is_remote BOOLEAN,
+    publication_date TIMESTAMP, status TEXT
+);
+CREATE TABLE job_locations (job_id INTEGER, location_id INTEGER);
+CREATE TABLE job_skills (job_id INTEGER, skill_id INTEGER);
+"""
+
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    path = tmp_path / "legacy.db"
+    sq = sqlite3.connect(path)
+    sq.executescript(LEGACY_SCHEMA)
+    sq.execute("INSERT INTO companies VALUES (1, 'Acme')")
+    # SQLite's UNIQUE treats NULL states as distinct, so Remote repeats
+    sq.executemany("INSERT INTO locations VALUES (?, ?, ?, ?)", [
+        (1, "Remote", None, "USA"),
+        (2, "Austin", "TX", "USA"),
+        (3, "Remote", None, "USA"),
+    ])
+    sq.execute("INSERT INTO skill_categories VALUES (1, 'Languages')")
+    sq.execute("INSERT INTO skills VALUES (1, 'python', 1)")
+    sq.executemany("INSERT INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [
+        (1, "ext-1", "Backend Engineer", 1, 100000.0, 1, "2025-01-02 03:04:05", "open"),
+        (2, "ext-2", "Data Engineer", 1, None, 0, None, "open"),
+    ])
+    sq.executemany("INSERT INTO job_locations VALUES (?, ?)", [(1, 1), (1, 2), (2, 3)])
+    sq.executemany("INSERT INTO job_skills VALUES (?, ?)", [(1, 1), (2, 1)])
+    sq.commit()
+    sq.close()
+    return str(path)
+
+
+class TestMigrate:
+    def test_folds_duplicate_stateless_locations(self, db_url, sqlite_path):
+        migrate(sqlite_path, db_url)
+
+        conn = psycopg2.connect(db_url)
+        try:
+            c = conn.cursor()
+            c.execute("SELECT id, city, state FROM locations ORDER BY id")
+            assert c.fetchall() == [(1, "Remote", None), (2, "Austin", "TX")]
+            c.execute("SELECT job_id, location_id FROM job_locations ORDER BY 1, 2")
+            assert c.fetchall() == [(1, 1), (1, 2), (2, 1)]
+            # The steps after the index build ran too
+            c.execute("SELECT total_jobs FROM dashboard_stats")
+            assert c.fetchone() == (2,)
+            c.execute("SELECT nextval(pg_get_serial_sequence('locations', 'id'))")
+            assert c.fetchone() == (3,)
+        finally:
+            conn.close()
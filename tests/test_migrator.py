@@ -64,6 +64,23 @@ class TestParseSkillsJson:
         result = m.parse_skills_json("{'Languages': ['python']}")
         assert result == {"Languages": ["python"]}
 
+    def test_apostrophe_inside_value(self):
+        m = DatabaseMigrator.__new__(DatabaseMigrator)
+        result = m.parse_skills_json("[{'name': \"Coeur d'Alene, ID\"}]")
+        assert result == [{"name": "Coeur d'Alene, ID"}]
+
+    def test_already_parsed(self):
+        m = DatabaseMigrator.__new__(DatabaseMigrator)
+        assert m.parse_skills_json(["python"]) == ["python"]
+
+    def test_json_literals(self):
+        m = DatabaseMigrator.__new__(DatabaseMigrator)
+        assert m.parse_skills_json('{"remote": true}') == {"remote": True}
+
+    def test_garbage(self):
+        m = DatabaseMigrator.__new__(DatabaseMigrator)
+        assert m.parse_skills_json("not [valid") == {}
+
     def test_empty_string(self):
         m = DatabaseMigrator.__new__(DatabaseMigrator)
         assert m.parse_skills_json("") == {}
@@ -95,6 +112,17 @@ class TestGetOrCreate:
         assert migrator.get_or_create_skill("", "Languages") is None
         assert migrator.get_or_create_skill("   ", "Languages") is None
 
+    def test_location_key_parsed_from_city_state(self, migrator):
+        loc_id = migrator.get_or_create_location([{"name": "Austin, TX"}], False)
+        assert migrator.location_cache[("Austin", "TX", "USA")] == loc_id
+        assert migrator.get_or_create_location(["Austin, TX"], False) == loc_id
+
+    def test_preloads_existing_rows(self, migrator):
+        assert migrator.company_cache["Acme Corp"] == 1
+        assert migrator.skill_cache[("python", "Languages")] == 1
+        assert migrator.get_or_create_skill("python", "Languages") == 1
+        assert migrator.stats["skills_created"] == 0
+
 
 # ── import_job ──────────────────────────────────────────────────
 
@@ -136,3 +164,43 @@ class TestImportJob:
         migrator.import_job(row)
         # Missing company should not count as imported
         assert migrator.stats["jobs_imported"] == 0
+
+    def test_bulk_create_lookups_fills_caches(self, migrator):
+        row = self._make_row(**{
+            "id": "EXT-777",
+            "company.name": "Initech",
+            "locations": "[{'name': 'Denver, CO'}]",
+            "skills_Concepts": "['graphql']",
+        })
+        migrator.bulk_create_lookups([row])
+        assert "Initech" in migrator.company_cache
+        assert ("Denver", "CO", "USA") in migrator.location_cache
+        assert ("graphql", "Concepts") in migrator.skill_cache
+        assert migrator.stats["companies_created"] == 1
+        assert migrator.import_job(row) is True
+
+    def test_import_jobs_batches_rows(self, migrator):
+        rows = [
+            self._make_row(id="EXT-B1"),
+            self._make_row(id="EXT-B2"),
+            self._make_row(id="EXT-B1", name="Renamed"),
+        ]
+        assert migrator.import_jobs(rows) == 3
+        assert migrator.stats["jobs_imported"] == 2
+        assert migrator.stats["jobs_updated"] == 1
+        migrator.cursor.execute("SELECT title FROM jobs WHERE external_job_id = 'EXT-B1'")
+        assert migrator.cursor.fetchone()[0] == "Renamed"
+
+    def test_links_skills_and_locations(self, migrator):
+        row = self._make_row(**{
+            "locations": "[{'name': 'Denver, CO'}]",
+            "skills_Languages": "['python', 'rust']",
+        })
+        assert migrator.import_job(row) is True
+        assert migrator.stats["job_skills_created"] == 2
+        migrator.cursor.execute(
+            """SELECT COUNT(*) FROM job_locations jl
+               JOIN jobs j ON jl.job_id = j.id
+               WHERE j.external_job_id = 'EXT-999'"""
+        )
+        assert migrator.cursor.fetchone()[0] == 1
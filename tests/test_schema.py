@@ -37,6 +37,16 @@ class TestSchemaIntegrity:
         conn.rollback()
         conn.close()
 
+    def test_unique_constraint_stateless_locations(self, db_url):
+        conn = psycopg2.connect(db_url)
+        cursor = conn.cursor()
+        with pytest.raises(psycopg2.errors.UniqueViolation):
+            cursor.execute(
+                "INSERT INTO locations (city, state, country) VALUES ('Remote', NULL, 'USA')"
+            )
+        conn.rollback()
+        conn.close()
+
     def test_unique_constraint_skills(self, db_url):
         conn = psycopg2.connect(db_url)
         cursor = conn.cursor()
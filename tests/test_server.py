@@ -86,6 +86,12 @@ class TestLocationsAutocomplete:
         resp = test_client.get("/locations/autocomplete?q=")
         assert resp.status_code == 400
 
+    def test_respects_limit_and_order(self, test_client):
+        data = test_client.get("/locations/autocomplete?q=n&limit=1").json()
+        assert len(data["suggestions"]) <= 1
+        full = test_client.get("/locations/autocomplete?q=n").json()["suggestions"]
+        assert full == sorted(full)
+
 
 # --- New endpoint tests ---
 
@@ -130,6 +136,29 @@ class TestDashboardStats:
         assert sal["avg_min"] is not None
         assert sal["avg_max"] is not None
 
+    def test_cached_between_requests(self, test_client, db_url):
+        """Repeat requests are served from the response cache until it expires."""
+        import psycopg2
+        from market_analyzer import response_cache
+        from market_analyzer.db_queries import refresh_dashboard_stats
+        assert test_client.get("/api/dashboard/stats").json()["total_jobs"] == 3
+        with psycopg2.connect(db_url) as conn, conn.cursor() as cur:
+            cur.execute("UPDATE jobs SET status = 'closed' WHERE id = 1")
+            refresh_dashboard_stats(cur)
+        assert test_client.get("/api/dashboard/stats").json()["total_jobs"] == 3
+        response_cache.reset()
+        assert test_client.get("/api/dashboard/stats").json()["total_jobs"] == 2
+
+    def test_reflects_closed_job_after_refresh(self, test_client, db_url):
+        """Closing a job drops it from total_jobs once the view is refreshed."""
+        import psycopg2
+        from market_analyzer.db_queries import refresh_dashboard_stats
+        with psycopg2.connect(db_url) as conn, conn.cursor() as cur:
+            cur.execute("UPDATE jobs SET status = 'closed' WHERE id = 1")
+            refresh_dashboard_stats(cur)
+        data = test_client.get("/api/dashboard/stats").json()
+        assert data["total_jobs"] == 2
+
 
 class TestJobsEndpoint:
     def test_returns_200(self, test_client):
@@ -161,6 +190,14 @@ class TestJobsEndpoint:
         assert len(data["jobs"]) >= 1
         assert any("Backend" in j["title"] for j in data["jobs"])
 
+    def test_search_matches_word_prefixes(self, test_client):
+        data = test_client.get("/api/jobs?search=full dev").json()
+        assert [j["title"] for j in data["jobs"]] == ["Fullstack Dev"]
+
+    def test_search_matches_company_name(self, test_client):
+        data = test_client.get("/api/jobs?search=globex").json()
+        assert [j["company"] for j in data["jobs"]] == ["Globex Inc"]
+
     def test_filter_by_skill(self, test_client):
         data = test_client.get("/api/jobs?skill=python").json()
         assert len(data["jobs"]) >= 1
@@ -202,6 +239,12 @@ class TestSalaryInsights:
         skill_names = [d["name"] for d in data["data"]]
         assert "communication" not in skill_names
 
+    def test_names_filter(self, test_client):
+        data = test_client.get("/api/salary/insights?group_by=skill&names=python,react").json()
+        assert sorted(d["name"] for d in data["data"]) == ["python", "react"]
+        data = test_client.get("/api/salary/insights?group_by=location&names=New York").json()
+        assert [d["name"] for d in data["data"]] == ["New York"]
+
     def test_invalid_group_by(self, test_client):
         resp = test_client.get("/api/salary/insights?group_by=invalid")
         assert resp.status_code == 400
@@ -54,3 +54,14 @@ class TestSkillRecommender:
         js = next((r for r in results if r["skill"] == "javascript"), None)
         assert js is not None
         assert js["score"] == 0.5
+
+    def test_reflects_new_links_after_refresh(self, skill_recommender, db_url):
+        """Linking django to job 3 makes P(django|python) = 2/2 once the views are refreshed."""
+        import psycopg2
+        from market_analyzer.skill_recommender import refresh_skill_counts
+        with psycopg2.connect(db_url) as conn, conn.cursor() as cur:
+            cur.execute("INSERT INTO job_skills (job_id, skill_id) VALUES (3, 4)")
+            refresh_skill_counts(cur)
+        results = skill_recommender.get_skill_recommendations("python")
+        django = next(r for r in results if r["skill"] == "django")
+        assert django["score"] == 1.0